@@ -0,0 +1,89 @@
+"""Response schemas for each analysis mode.
+
+The schemas are passed to Gemini as `response_schema` (OpenAPI subset, as
+accepted by google-genai) and reused to validate the parsed output, so a
+result only reaches the templates when it has the fields they render.
+"""
+
+def _string():
+    return {'type': 'STRING'}
+
+def _strings(min_items=None, max_items=None):
+    schema = {'type': 'ARRAY', 'items': _string()}
+    if min_items is not None:
+        schema['min_items'] = min_items
+    if max_items is not None:
+        schema['max_items'] = max_items
+    return schema
+
+def _object(properties, required=None):
+    return {'type': 'OBJECT', 'properties': properties, 'required': list(required or properties)}
+
+MESSAGE_TYPES = ('casual_connect', 'value_first_connect', 'recruiting_outreach',
+                 'sales_outreach', 'mentorship_ask', 'collaboration_proposal')
+
+ANALYSIS_SCHEMAS = {
+    'about_profile': _object({
+        'who_they_are': _string(),
+        'what_they_specialize_in': _string(),
+        'seniority_level': _string(),
+        'key_strengths': _strings(max_items=5),
+        'career_trajectory': _string(),
+        'potential_talking_points': _string(),
+    }),
+    'approach_person': _object({
+        'outreach_angles': {
+            'type': 'ARRAY',
+            'items': _object({'angle_type': _string(), 'explanation': _string()}),
+            'min_items': 1,
+            'max_items': 5,
+        },
+        'personalized_messages': _object({message: _string() for message in MESSAGE_TYPES}),
+    }),
+    'compatibility_score': _object({
+        'compatibility_score': {'type': 'INTEGER', 'minimum': 0, 'maximum': 100},
+        'why': _strings(min_items=1, max_items=5),
+        'recommendation': _string(),
+    }),
+}
+
+_PYTHON_TYPES = {
+    'OBJECT': dict,
+    'ARRAY': list,
+    'STRING': str,
+    'INTEGER': int,
+    'NUMBER': (int, float),
+    'BOOLEAN': bool,
+}
+
+def validate(value, schema, path='$'):
+    """List of problems with value against schema (empty when it is valid)"""
+    expected = _PYTHON_TYPES[schema['type']]
+    if not isinstance(value, expected) or (isinstance(value, bool) and schema['type'] != 'BOOLEAN'):
+        return [f"{path}: expected {schema['type'].lower()}, got {type(value).__name__}"]
+
+    errors = []
+    if schema['type'] == 'OBJECT':
+        for key in schema.get('required', ()):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing")
+        for key, sub_schema in schema.get('properties', {}).items():
+            if key in value:
+                errors.extend(validate(value[key], sub_schema, f"{path}.{key}"))
+    elif schema['type'] == 'ARRAY':
+        # max_items only guides generation; a slightly longer list still renders
+        if len(value) < schema.get('min_items', 0):
+            errors.append(f"{path}: expected at least {schema['min_items']} items")
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema['items'], f"{path}[{i}]"))
+    elif schema['type'] in ('INTEGER', 'NUMBER'):
+        if 'minimum' in schema and value < schema['minimum']:
+            errors.append(f"{path}: below {schema['minimum']}")
+        if 'maximum' in schema and value > schema['maximum']:
+            errors.append(f"{path}: above {schema['maximum']}")
+    return errors
+
+def validate_result(mode, result):
+    """Validate the parsed output for mode; modes without a schema always pass"""
+    schema = ANALYSIS_SCHEMAS.get(mode)
+    return validate(result, schema) if schema else []
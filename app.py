@@ -1,17 +1,26 @@
-from flask import Flask, render_template, request, flash, redirect, url_for
-import os, logging, sys, argparse
-from scraper import scrape_linkedin_profile
-from summarizer import analyze_profile
-from config import FLASK_ENV, FLASK_DEBUG, HEADLESS
-from dotenv import load_dotenv
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(name)s - %(levelname)s - %(message)s'
-)
+# Heavy dependencies (Flask, Playwright, google-genai, NumPy) are imported
+# by the modes that use them, so --help, search and stats start quickly.
+# Environment and logging are set up once by config.
+from config import FLASK_ENV, FLASK_DEBUG, HEADLESS, SERVE_BIND, SERVE_WORKERS, SERVE_THREADS, PIPELINED_ANALYSIS
+from config import RESULT_PAGE_CACHE_SIZE, RESULT_MAX_AGE, STATIC_MAX_AGE, HOT_REFRESH_ENABLED
+import os, logging, sys, argparse, hashlib, threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from summarizer import analyze_profile, required_fields
+from profile_store import ProfileStore
+from pipeline import PipelinedAnalysis
+from result_store import ResultStore
+from models import Profile
+from profile_urls import canonicalize_profile_url, profile_key
+from singleflight import SingleFlight
+from search_index import SearchIndex
+from similar_index import SimilarIndex
+from usage_log import usage_log
+from model_router import model_router
+from hot_refresh import HotProfileRefresher
+
 logger = logging.getLogger(__name__)
-load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY",None)
 
 def console_mode():
@@ -26,15 +35,19 @@ def console_mode():
         return
     
     profile_url = input("Enter LinkedIn Profile URL: ").strip()
-    if "linkedin.com/in/" not in profile_url:
+    try:
+        profile_url = canonicalize_profile_url(profile_url)
+    except ValueError:
         logger.error("Invalid Input")
         print("\nInvalid LinkedIn profile URL. Please provide a valid LinkedIn profile URL.\n")
         return
     
     print(f"\n Scraping profile: {profile_url}")
+    from scraper import scrape_linkedin_profile
+    store = ProfileStore()
 
     try:
-        profile_data = scrape_linkedin_profile(profile_url, headless=HEADLESS)
+        profile_data = scrape_linkedin_profile(profile_url, headless=HEADLESS, store=store)
         if not profile_data:
             print("\n\n\t\tFailed to scrape profile data\n\n")
             return
@@ -74,21 +87,28 @@ def console_mode():
         
         if mode == 'all':
             user_data = None
+            user_url= input("Enter Your Profile URL to check score: ").strip()
+            try:
+                user_url = canonicalize_profile_url(user_url)
+            except ValueError:
+                logger.error("Invalid Input")
+                print("\nInvalid LinkedIn profile URL. Please provide a valid LinkedIn profile URL.\n")
+                return
+
+            # Prefetch the user profile while the other analyses are generated
+            print(f"\n Scraping profile in background: {user_url}")
+            prefetch = ThreadPoolExecutor(max_workers=1)
+            user_future = prefetch.submit(scrape_linkedin_profile, user_url, headless=HEADLESS, store=store,
+                                          fields=required_fields('compatibility_score'))
+            prefetch.shutdown(wait=False)
+
             print("\n Generating all analysis types...")
             modes = ['about_profile', 'approach_person', 'compatibility_score']
             
             for analysis_mode in modes:
                 if analysis_mode == 'compatibility_score':
-                    user_url= input("Enter Your Profile URL to check score: ").strip()
-                    if "linkedin.com/in/" not in user_url:
-                        logger.error("Invalid Input")
-                        print("\nInvalid LinkedIn profile URL. Please provide a valid LinkedIn profile URL.\n")
-                        return
-                    
-                    print(f"\n Scraping profile: {user_url}")
-
                     try:
-                        user_data = scrape_linkedin_profile(user_url, headless=HEADLESS)
+                        user_data = user_future.result()
                         if not user_data:
                             print("\n\n\t\tFailed to scrape profile data\n\n")
                             return
@@ -114,7 +134,9 @@ def console_mode():
             print(f"\n Generating {mode}...")
             if mode == 'compatibility_score':
                 user_url= input("Enter Your Profile URL to check score: ").strip()
-                if "linkedin.com/in/" not in user_url:
+                try:
+                    user_url = canonicalize_profile_url(user_url)
+                except ValueError:
                     logger.error("Invalid Input")
                     print("\nInvalid LinkedIn profile URL. Please provide a valid LinkedIn profile URL.\n")
                     return
@@ -122,7 +144,8 @@ def console_mode():
                 print(f"\n Scraping profile: {user_url}")
 
                 try:
-                    user_data = scrape_linkedin_profile(user_url, headless=HEADLESS)
+                    user_data = scrape_linkedin_profile(user_url, headless=HEADLESS, store=store,
+                                                        fields=required_fields('compatibility_score'))
                     if not user_data:
                         print("\n\n\t\tFailed to scrape profile data\n\n")
                         return
@@ -149,10 +172,106 @@ def console_mode():
         logger.exception(f"Error in console mode: {e}")
         
     
-def create_flask_app():
+def scrape_profiles(jobs, store=None, on_section=None):
+    """Scrape (profile_url, fields) jobs concurrently, on this process's
+    browser workers when serving, else with one-off browsers (also the
+    fallback when every browser worker failed to start)"""
+    from browser_worker import get_browser_workers, scrape_concurrently
+    if get_browser_workers():
+        return scrape_concurrently(jobs, store=store, on_section=on_section)
+    from scraper import scrape_linkedin_profiles
+    return scrape_linkedin_profiles(jobs, headless=HEADLESS, store=store, on_section=on_section)
+
+def create_flask_app(scrape=None, genai_client=None):
+    """Build the web app. `scrape` replaces scrape_profiles and `genai_client`
+    replaces the Gemini client; loadtest.py uses both to run offline."""
+    from flask import Flask, render_template, request, flash, redirect, url_for, make_response, abort, jsonify
+    scrape = scrape or scrape_profiles
     app = Flask(__name__)
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
     app.config["FLASK_ENV"] = FLASK_ENV
+    # Static URLs carry a content fingerprint, so they can be cached for good
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = STATIC_MAX_AGE
+    store = ProfileStore()
+    results = ResultStore()
+    flights = SingleFlight()
+    # Indexes load from disk on first use rather than at worker boot
+    indexes = {}
+    indexes_lock = threading.Lock()
+
+    def get_index(index_type):
+        with indexes_lock:
+            if index_type not in indexes:
+                indexes[index_type] = index_type()
+            return indexes[index_type]
+    refresher = HotProfileRefresher(store, scrape)
+    if HOT_REFRESH_ENABLED:
+        refresher.start()
+    rendered_pages = OrderedDict()
+    rendered_pages_lock = threading.Lock()
+    static_versions = {}
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint != 'static' or 'filename' not in values:
+            return
+        path = os.path.join(app.static_folder, values['filename'])
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return
+        cached = static_versions.get(path)
+        if not cached or cached[0] != mtime:
+            with open(path, 'rb') as f:
+                cached = (mtime, hashlib.md5(f.read()).hexdigest()[:10])
+            static_versions[path] = cached
+        values['v'] = cached[1]
+
+    def run_analysis(profile_url, user_url, analysis_mode):
+        """Scrape and analyze; returns (profile_data, user_data, analysis_result, error)"""
+        user_data = None
+        pipeline = None
+        # The actual profile, and the user profile alongside it for compatibility_score
+        jobs = [(profile_url, required_fields(analysis_mode))]
+        if analysis_mode == "compatibility_score":
+            jobs.append((user_url, required_fields('compatibility_score')))
+        # Fresh stored profiles (kept warm by the hot-profile refresher) skip the scrape
+        cached = [store.get_fresh(url, fields) for url, fields in jobs]
+        pending = [job for job, profile in zip(jobs, cached) if profile is None]
+        if pending and analysis_mode != "compatibility_score" and PIPELINED_ANALYSIS and not usage_log.near_budget():
+            # Start the analysis on partial data while detail pages are still loading.
+            # Skipped close to the token budget, as a discarded speculation wastes tokens
+            stored = store.get(profile_url)
+            pipeline = PipelinedAnalysis(profile_url, analysis_mode,
+                                         predicted=stored['profile'] if stored else None,
+                                         client=genai_client)
+        if pending:
+            scraped = iter(scrape(pending, store=store, on_section=pipeline.publish if pipeline else None))
+            results = [profile if profile is not None else next(scraped) for profile in cached]
+        else:
+            logger.info(f"Serving {analysis_mode} from stored profile data")
+            results = cached
+        profile_data = results[0]
+
+        if not profile_data:
+            if pipeline:
+                pipeline.cancel()
+            return None, None, None, 'Failed to scrape profile data. Please check the URL and try again.'
+
+        if analysis_mode == "compatibility_score":
+            user_data = results[1]
+            if not user_data:
+                return profile_data, None, None, 'Failed to scrape your profile data. Please check the URL and try again.'
+
+        # Generate analysis based on mode
+        if pipeline:
+            analysis_result = pipeline.finish(profile_data)
+        elif analysis_mode == "compatibility_score":
+            analysis_result = analyze_profile(profile_data, analysis_mode, user_data=user_data, client=genai_client)
+        else:
+            analysis_result = analyze_profile(profile_data, analysis_mode, client=genai_client)
+
+        return profile_data, user_data, analysis_result, None
 
     @app.route('/')
     def index():
@@ -171,7 +290,9 @@ def create_flask_app():
                 if not profile_url:
                     flash('Please provide a LinkedIn profile URL', 'error')
                     return redirect(url_for('index'))
-                if "linkedin.com/in/" not in profile_url:
+                try:
+                    profile_url = canonicalize_profile_url(profile_url)
+                except ValueError:
                     flash('Please provide a valid LinkedIn profile URL', 'error')
                     return redirect(url_for('index'))
             
@@ -180,9 +301,12 @@ def create_flask_app():
                 if not use_sample and not user_url:
                     flash('Please provide your LinkedIn profile URL for compatibility score analysis', 'error')
                     return redirect(url_for('index'))
-                if not use_sample and "linkedin.com/in/" not in user_url:
-                    flash('Please provide a valid LinkedIn profile URL for your profile', 'error')
-                    return redirect(url_for('index'))
+                if not use_sample:
+                    try:
+                        user_url = canonicalize_profile_url(user_url)
+                    except ValueError:
+                        flash('Please provide a valid LinkedIn profile URL for your profile', 'error')
+                        return redirect(url_for('index'))
             
             user_data = None
             if use_sample:
@@ -197,8 +321,11 @@ def create_flask_app():
                         {'title': 'Junior Developer', 'company': 'Web Solutions'}
                     ],
                     'skills': ['Python', 'JavaScript', 'React', 'Node.js', 'AWS', 'Docker', 'Git', 'SQL', 'MongoDB', 'REST APIs'],
-                    'education': ['Bachelor of Science in Computer Science', 'Master of Science in Artificial Intelligence'],
-                    'certifications': [{'certificate':'Some Course Certifications', 'link':'some_url', 'issuer':'issued by some company', 'date':'some date'}],
+                    'education': [
+                        {'school': 'State University', 'degree': 'Bachelor of Science', 'field': 'Computer Science', 'year': '2012 - 2016'},
+                        {'school': 'Tech Institute', 'degree': 'Master of Science', 'field': 'Artificial Intelligence', 'year': '2016 - 2018'}
+                    ],
+                    'certifications': [{'certificate': 'Some Course Certifications', 'link': '', 'issuer': 'Some Company', 'date': ''}],
                     'url': profile_url
                 }
                 # For compatibility_score with sample data, use sample user data too
@@ -213,45 +340,110 @@ def create_flask_app():
                             {'title': 'Business Analyst', 'company': 'Analytics Firm'}
                         ],
                         'skills': ['Product Strategy', 'Agile', 'Data Analysis', 'Python', 'SQL', 'Jira', 'Figma'],
-                        'education': ['MBA in Business Administration', 'Bachelor of Science in Economics'],
-                        'certifications': [{'certificate': 'Certified Scrum Product Owner', 'link': 'some_url', 'issuer': 'Scrum Alliance', 'date': 'some date'}],
+                        'education': [
+                            {'school': 'Business School', 'degree': 'MBA', 'field': 'Business Administration', 'year': ''},
+                            {'school': 'City College', 'degree': 'Bachelor of Science', 'field': 'Economics', 'year': ''}
+                        ],
+                        'certifications': [{'certificate': 'Certified Scrum Product Owner', 'link': '', 'issuer': 'Scrum Alliance', 'date': ''}],
                         'url': 'https://www.linkedin.com/in/sample-pm'
                     }
                 flash('Using sample data for demonstration', 'info')
+                if user_data:
+                    analysis_result = analyze_profile(profile_data, analysis_mode, user_data=user_data, client=genai_client)
+                else:
+                    analysis_result = analyze_profile(profile_data, analysis_mode, client=genai_client)
             else:
-                # Scrape the actual profile
-                profile_data = scrape_linkedin_profile(profile_url, headless=HEADLESS)
-                
-                if not profile_data:
-                    flash('Failed to scrape profile data. Please check the URL and try again.', 'error')
-                    return redirect(url_for('index'))
-                
-                # For compatibility_score, also scrape user profile
+                # Concurrent requests for the same profiles share one scrape and analysis
+                flight_key = (analysis_mode, profile_key(profile_url),
+                              profile_key(user_url) if analysis_mode == "compatibility_score" else None)
+                refresher.tracker.touch(profile_url)
                 if analysis_mode == "compatibility_score":
-                    user_data = scrape_linkedin_profile(user_url, headless=HEADLESS)
-                    if not user_data:
-                        flash('Failed to scrape your profile data. Please check the URL and try again.', 'error')
-                        return redirect(url_for('index'))
-
-            # Generate analysis based on mode
-            if analysis_mode == "compatibility_score":
-                analysis_result = analyze_profile(profile_data, analysis_mode, user_data=user_data)
-            else:
-                analysis_result = analyze_profile(profile_data, analysis_mode)
+                    refresher.tracker.touch(user_url)
+                with refresher.activity():
+                    profile_data, user_data, analysis_result, error = flights.do(
+                        flight_key, run_analysis, profile_url, user_url, analysis_mode)
+                if error:
+                    flash(error, 'error')
+                    return redirect(url_for('index'))
 
+            if analysis_result and analysis_result.get('budget_exceeded'):
+                flash(analysis_result['result'], 'error')
+                return redirect(url_for('index'))
             if not analysis_result or analysis_result.get('error'):
                 flash('Failed to generate analysis. Please check your Gemini API key.', 'error')
                 return redirect(url_for('index'))
             
-            return render_template('result.html', 
-                profile_data=profile_data,
-                user_data=user_data,
-                analysis_result=analysis_result)
+            result_id = results.put(profile_data, user_data, analysis_result)
+            return redirect(url_for('result', result_id=result_id), code=303)
             
         except Exception as e:
             logger.exception(f"Error in Flask route: {e}")
             flash(f'An error occurred: {str(e)}', 'error')
             return redirect(url_for('index'))
+
+    @app.route('/search')
+    def search():
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Missing query parameter q'}), 400
+        limit = min(request.args.get('limit', 20, type=int), 200)
+        search_index = get_index(SearchIndex)
+        search_index.sync(store)
+        return jsonify({'query': query, 'results': search_index.search(query, limit=limit)})
+
+    @app.route('/similar')
+    def similar():
+        try:
+            profile_url = canonicalize_profile_url(request.args.get('url', ''))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        limit = min(request.args.get('limit', 10, type=int), 100)
+        similar_index = get_index(SimilarIndex)
+        similar_index.sync(store)
+        matches = similar_index.similar(profile_url, store=store, limit=limit)
+        if matches is None:
+            return jsonify({'error': 'Profile has not been scraped yet'}), 404
+        return jsonify({'url': profile_url, 'results': matches})
+
+    @app.route('/stats')
+    def stats():
+        days = max(1, min(request.args.get('days', 1, type=int), 30))
+        # Model health is per worker process; token usage is shared through the log
+        return jsonify(dict(usage_log.summary(days), model_health=model_router.health()))
+
+    @app.route('/result/<result_id>')
+    def result(result_id):
+        record = results.get(result_id)
+        if not record:
+            abort(404)
+
+        last_modified = datetime.fromtimestamp(int(record['created_at']), timezone.utc)
+        if request.if_none_match.contains(result_id) or (
+                not request.if_none_match and request.if_modified_since
+                and request.if_modified_since >= last_modified):
+            response = make_response('', 304)
+        else:
+            with rendered_pages_lock:
+                html = rendered_pages.get(result_id)
+                if html is not None:
+                    rendered_pages.move_to_end(result_id)
+            if html is None:
+                user_data = record['user_data']
+                html = render_template('result.html',
+                    profile_data=Profile.from_dict(record['profile_data']),
+                    user_data=Profile.from_dict(user_data) if user_data else None,
+                    analysis_result=record['analysis_result'])
+                with rendered_pages_lock:
+                    rendered_pages[result_id] = html
+                    if len(rendered_pages) > RESULT_PAGE_CACHE_SIZE:
+                        rendered_pages.popitem(last=False)
+            response = make_response(html)
+
+        response.set_etag(result_id)
+        response.last_modified = last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = RESULT_MAX_AGE
+        return response
             
     return app
 
@@ -276,14 +468,110 @@ def web_mode():
     except Exception as e:
         print(f"\n Error starting server: {str(e)}")
 
+def serve_mode(bind=SERVE_BIND, workers=SERVE_WORKERS, threads=SERVE_THREADS):
+    """Multi-process production server; each worker owns and warms its own browser"""
+    print("=" * 60)
+    print("LinkedIn Profile Analyzer - Serve Mode")
+    print("=" * 60)
+
+    if not API_KEY:
+        logger.error("Error: Gemini API key not found!")
+        print("Please set your API_KEY in the .env file")
+        return
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        print("Serve mode needs gunicorn: pip install gunicorn")
+        return
+    from browser_worker import start_browser_workers, stop_browser_workers
+
+    class ServeApplication(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return create_flask_app()
+
+    options = {
+        "bind": bind,
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        # Warming a browser and logging in can take a while
+        "timeout": 300,
+        "graceful_timeout": 60,
+        "post_worker_init": lambda worker: start_browser_workers(),
+        "worker_exit": lambda server, worker: stop_browser_workers(),
+    }
+    print(f"Serving on http://{bind} with {workers} workers x {threads} threads")
+    ServeApplication(options).run()
+
+def search_mode(query, limit=20):
+    """Search already scraped profiles from the command line"""
+    index = SearchIndex()
+    index.sync(ProfileStore(), force=True)
+    matches = index.search(query, limit=limit)
+    if not matches:
+        print("No matching profiles found")
+        return
+    for match in matches:
+        print(f"{match['score']:>7.3f}  {match['name']} - {match['headline']}")
+        print(f"         {match['url']}")
+
+def stats_mode(days=1):
+    """Print Gemini token usage and latency per mode and model"""
+    summary = usage_log.summary(days)
+    budget = summary['daily_budget']
+    print(f"Tokens today: {summary['tokens_today']}" + (f" of {budget}" if budget else " (no daily budget)"))
+    print(f"\nLast {days} day(s):")
+    print(f"{'mode':<22}{'model':<24}{'calls':>7}{'errors':>8}{'tokens':>10}{'avg prompt':>12}{'p50 ms':>9}{'p95 ms':>9}")
+    for row in summary['by_mode_model']:
+        print(f"{row['mode']:<22}{row['model']:<24}{row['calls']:>7}{row['errors']:>8}{row['total_tokens']:>10}"
+              f"{row['avg_prompt_tokens']:>12}{row['p50_latency_ms']:>9}{row['p95_latency_ms']:>9}")
+
+def browser_server_mode():
+    from browser_server import BrowserServer
+    print("=" * 60)
+    print("LinkedIn Profile Analyzer - Browser Server")
+    print("=" * 60)
+
+    server = BrowserServer()
+    print(f"Set BROWSER_SERVER_ENDPOINT={server.endpoint} for workers to attach")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\n Browser server stopped by user")
+
 def main():
     parser = argparse.ArgumentParser(description="LinkedIn Profile Analyzer")
-    parser.add_argument("--mode", choices=["console", "web"], default="web",
-                        help="Run in console or web mode")
+    parser.add_argument("--mode", choices=["console", "web", "serve", "browser-server", "search", "stats"], default="web",
+                        help="Run in console or web mode, serve with multiple workers, start the shared browser server, search scraped profiles or show Gemini usage")
+    parser.add_argument("--query", help="Query for search mode, e.g. 'skill:kubernetes company:fin*'")
+    parser.add_argument("--limit", type=int, default=20, help="Max results for search mode")
+    parser.add_argument("--days", type=int, default=1, help="Days of usage to summarise in stats mode")
+    parser.add_argument("--bind", default=SERVE_BIND, help="Address for serve mode")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="Worker processes for serve mode")
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS, help="Threads per worker for serve mode")
     args = parser.parse_args()
 
     if args.mode == "console":
         console_mode()
+    elif args.mode == "serve":
+        serve_mode(args.bind, args.workers, args.threads)
+    elif args.mode == "search":
+        if not args.query:
+            parser.error("--mode search requires --query")
+        search_mode(args.query, args.limit)
+    elif args.mode == "stats":
+        stats_mode(args.days)
+    elif args.mode == "browser-server":
+        browser_server_mode()
     else:
         web_mode()
 
@@ -0,0 +1,71 @@
+import time, logging
+from playwright.sync_api import sync_playwright
+from config import HEADLESS, BROWSER_SERVER_PORT
+from linkedin_login import BROWSER_ARGS
+
+logger = logging.getLogger(__name__)
+
+class BrowserServer:
+    """Long-lived Chromium exposing a CDP endpoint for LinkedInLogin to attach to.
+
+    Playwright for Python has no launch_server(), so the browser is launched
+    with a remote debugging port and workers use connect_over_cdp().
+    """
+
+    def __init__(self, port=BROWSER_SERVER_PORT, headless=HEADLESS, check_interval=5):
+        self.port = port
+        self.headless = headless
+        self.check_interval = check_interval
+        self.playwright = None
+        self.browser = None
+        self.keepalive_page = None
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        if not self.playwright:
+            self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_ARGS + [f"--remote-debugging-port={self.port}"]
+        )
+        # Waiting on a page keeps Playwright's event loop running, so a crashed
+        # browser is noticed instead of blocking in time.sleep()
+        self.keepalive_page = self.browser.new_page()
+        logger.info(f"Browser server listening on {self.endpoint}")
+
+    def restart(self):
+        logger.warning("Browser server process is gone, restarting...")
+        try:
+            if self.browser:
+                self.browser.close()
+        except Exception:
+            pass
+        self.start()
+
+    def serve_forever(self):
+        """Keep the browser alive, restarting it whenever it exits"""
+        self.start()
+        try:
+            while True:
+                try:
+                    self.keepalive_page.wait_for_timeout(self.check_interval * 1000)
+                except Exception as e:
+                    logger.warning(f"Browser server health check failed: {e}")
+                if not self.browser.is_connected():
+                    self.restart()
+                    time.sleep(1)
+        finally:
+            self.stop()
+
+    def stop(self):
+        try:
+            if self.browser:
+                self.browser.close()
+            if self.playwright:
+                self.playwright.stop()
+            logger.info("Browser server stopped.")
+        except Exception as e:
+            logger.exception(f"Error stopping browser server: {e}")
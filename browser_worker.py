@@ -0,0 +1,118 @@
+import queue, logging, threading
+from concurrent.futures import Future
+from config import HEADLESS, SERVE_BROWSERS_PER_WORKER
+from linkedin_login import claim_profile_slot
+
+logger = logging.getLogger(__name__)
+
+_workers = []
+
+def _resolve(future, done):
+    """Settle `future` with the outcome of the finished future `done`"""
+    try:
+        future.set_result(done.result())
+    except Exception as e:
+        future.set_exception(e)
+
+class BrowserWorker:
+    """Owns one browser for the life of a serving process.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    scrape is handed to a single browser thread and request threads only
+    wait on the returned future.
+    """
+
+    def __init__(self, user_data_dir, slot_lock=None, headless=HEADLESS):
+        self.name = user_data_dir.name
+        self.headless = headless
+        self.user_data_dir = user_data_dir
+        self.slot_lock = slot_lock
+        self.scraper = None
+        self.jobs = queue.Queue()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"browser-{self.name}", daemon=True)
+
+    def start(self, timeout=120):
+        """Start the browser thread and wait until the browser is warm"""
+        self.thread.start()
+        if not self.ready.wait(timeout):
+            logger.warning(f"Browser worker {self.name} did not warm up within {timeout}s")
+        return self
+
+    def _run(self):
+        from scraper import LinkedInScraper
+        try:
+            self.scraper = LinkedInScraper(headless=self.headless, user_data_dir=self.user_data_dir,
+                                           profile_lock=self.slot_lock)
+            logger.info(f"Browser worker {self.name} warmed up")
+        except Exception as e:
+            logger.exception(f"Browser worker {self.name} failed to start: {e}")
+        finally:
+            self.ready.set()
+
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            fn, args, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(self.scraper, *args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            if isinstance(result, Future):
+                # The job finishes off this thread (e.g. snapshot parsing), which takes the next one
+                result.add_done_callback(lambda done, future=future: _resolve(future, done))
+            else:
+                future.set_result(result)
+
+        if self.scraper:
+            # LinkedInLogin.close saves cookies before the browser goes away
+            self.scraper.close()
+            logger.info(f"Browser worker {self.name} closed")
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(scraper, *args, **kwargs) on the browser thread"""
+        future = Future()
+        self.jobs.put((fn, args, kwargs, future))
+        return future
+
+    def stop(self, timeout=30):
+        self.jobs.put(None)
+        self.thread.join(timeout)
+        if self.slot_lock:
+            self.slot_lock.close()
+
+def start_browser_workers(count=SERVE_BROWSERS_PER_WORKER):
+    """Start this process's browser workers (called once per serving process)"""
+    while len(_workers) < count:
+        user_data_dir, slot_lock = claim_profile_slot()
+        _workers.append(BrowserWorker(user_data_dir, slot_lock=slot_lock).start())
+    return _workers
+
+def get_browser_workers():
+    """Workers whose browser started; failed ones stay out of rotation"""
+    return [w for w in _workers if w.scraper]
+
+def scrape_concurrently(jobs, store=None, on_section=None):
+    """Scrape (profile_url, fields) jobs on different browsers of this process.
+
+    Jobs go to the least busy workers first, so a two-profile request uses
+    both browsers of a process at once. Returns results in job order.
+    """
+    from scraper import scrape_with
+    workers = sorted(get_browser_workers(), key=lambda w: w.jobs.qsize())
+    if not workers:
+        raise RuntimeError("No browser worker is available")
+    futures = []
+    for index, (profile_url, fields) in enumerate(jobs):
+        worker = workers[index % len(workers)]
+        futures.append(worker.submit(scrape_with, profile_url, store=store, fields=fields, on_section=on_section,
+                                     wait=False))
+    return [future.result() for future in futures]
+
+def stop_browser_workers():
+    while _workers:
+        _workers.pop().stop()
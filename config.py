@@ -1,6 +1,128 @@
+import os, logging
+from dotenv import load_dotenv
+
+# Environment and logging are set up once, here; every module imports config
+load_dotenv()
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(name)s - %(levelname)s - %(message)s'
+)
+
 FLASK_ENV="development"
 FLASK_DEBUG= True
 HEADLESS = True
 MAX_SCRAPE_PER_ACCOUNT = 10
 MAX_SESSION_DURATION = 1800
-ACCOUNT_COOLDOWN_HOURS=6
\ No newline at end of file
+ACCOUNT_COOLDOWN_HOURS=6
+PROFILE_STORE_DIR = "profile_store"
+
+# Max items extracted per section; None means "full" (page through the details list)
+SECTION_LIMITS = {
+    "experience": 5,
+    "skills": 15,
+    "certifications": 5,
+    "education": 5,
+}
+
+# Optional long-lived browser (app.py --mode browser-server) that scrapers attach to over CDP
+BROWSER_SERVER_PORT = 9222
+BROWSER_SERVER_ENDPOINT = os.getenv("BROWSER_SERVER_ENDPOINT")
+BROWSER_SERVER_CONNECT_RETRIES = 3
+
+# Production serving (app.py --mode serve)
+SERVE_BIND = "127.0.0.1:8000"
+SERVE_WORKERS = os.cpu_count() or 2
+SERVE_THREADS = 4
+# Two browsers per worker let both profiles of a compatibility check scrape at once
+SERVE_BROWSERS_PER_WORKER = 2
+
+# Hit counts used to order fallback selectors
+SELECTOR_STATS_FILE = "selector_stats.json"
+# Seconds between writes of new hit counts (also written at exit)
+SELECTOR_STATS_FLUSH_INTERVAL = 60
+
+# Start single-profile analyses on partial scrape data (see pipeline.py)
+PIPELINED_ANALYSIS = True
+# Capture each page's HTML once and extract fields from it in worker processes
+# (see snapshot_parser.py) instead of querying the live DOM; needs lxml
+HTML_SNAPSHOT = False
+SNAPSHOT_PARSE_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Recycle a long-lived browser context after this many scrapes or this much RSS (0 disables)
+BROWSER_RECYCLE_SCRAPES = 25
+BROWSER_RECYCLE_RSS_MB = 1500
+# Chromium's HTTP disk cache per browser profile (passed as --disk-cache-size)
+BROWSER_DISK_CACHE_MB = 64
+# Cache directories of a browser profile are pruned before a launch once they
+# exceed this; cookies and local storage are kept (0 disables)
+PROFILE_CACHE_PRUNE_MB = 150
+
+RESULT_STORE_DIR = "result_store"
+# Rendered result pages kept in memory per process
+RESULT_PAGE_CACHE_SIZE = 256
+RESULT_MAX_AGE = 3600
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+SEARCH_INDEX_FILE = "search_index.json"
+# Seconds between checks of the profile store for newly scraped profiles
+SEARCH_SYNC_INTERVAL = 30
+
+SIMILAR_INDEX_DIR = "similar_index"
+# Hashed term-frequency buckets per profile vector (float32 rows)
+SIMILAR_VECTOR_DIM = 512
+
+# Gemini token usage and latency, one JSON line per call in a file per day
+USAGE_LOG_DIR = "usage_log"
+USAGE_RETENTION_DAYS = 14
+# Tokens per day across all modes; unset or 0 disables the budget
+DAILY_TOKEN_BUDGET = int(os.getenv("DAILY_TOKEN_BUDGET", "0")) or None
+# Share of the budget after which speculative (possibly wasted) generations stop
+BUDGET_SPECULATION_CUTOFF = 0.8
+
+# Gemini models tried per analysis mode, in order. Later models are the
+# fallback on API errors and the escalation when output fails validation.
+MODEL_ROUTES = {
+    "about_profile": ["gemini-2.5-flash-lite", "gemini-2.5-flash"],
+    "approach_person": ["gemini-2.5-flash", "gemini-2.5-pro"],
+    "compatibility_score": ["gemini-2.5-flash", "gemini-2.5-pro"],
+}
+DEFAULT_MODEL_ROUTE = ["gemini-2.5-flash", "gemini-2.5-pro"]
+# Thinking budget sent with every call, per model. Thinking tokens count
+# towards max_output_tokens, so each call is capped at the mode's answer cap
+# plus this budget. flash-lite does not think by default (0); 2.5 Pro cannot
+# go below 128. Setting a model to 0 turns its thinking off.
+MODEL_THINKING_BUDGETS = {
+    "gemini-2.5-flash-lite": 0,
+    "gemini-2.5-flash": 1024,
+    "gemini-2.5-pro": 1024,
+}
+# For models not listed above
+DEFAULT_THINKING_BUDGET = 1024
+# A model is moved to the back of its chains for MODEL_DEMOTE_SECONDS when
+# its recent calls cross either threshold
+MODEL_DEMOTE_P95_MS = 20000
+MODEL_DEMOTE_ERROR_RATE = 0.25
+MODEL_HEALTH_WINDOW = 50
+MODEL_HEALTH_MIN_CALLS = 10
+MODEL_DEMOTE_SECONDS = 300
+
+# Stored profiles younger than this are served without scraping
+PROFILE_CACHE_MAX_AGE = 24 * 3600
+# Background refresh of frequently analyzed profiles (see hot_refresh.py);
+# only runs in serve mode, on the workers' browsers
+HOT_REFRESH_ENABLED = True
+# Profile accesses shared by serving workers, and the lock that picks the one that refreshes
+HOT_PROFILES_FILE = "hot_profiles.json"
+HOT_REFRESH_LOCK_FILE = "hot_refresh.lock"
+# Hotness decays by half over this many seconds without access
+HOT_REFRESH_HALF_LIFE = 3 * 24 * 3600
+# Roughly three recent requests (each adds 1 to the decaying score)
+HOT_REFRESH_MIN_SCORE = 2.5
+# Refresh hot profiles once their stored copy is this old, well before it expires
+HOT_REFRESH_AFTER = 12 * 3600
+# Only refresh after this long without user requests
+HOT_REFRESH_IDLE_SECONDS = 120
+HOT_REFRESH_CHECK_INTERVAL = 60
+HOT_REFRESH_MAX_PER_HOUR = 4
+# Share of the remaining account quota kept for user-facing scrapes
+HOT_REFRESH_QUOTA_RESERVE = 0.5
@@ -0,0 +1,43 @@
+"""Cross-process file locks: fcntl on POSIX, msvcrt on Windows, and no
+locking where neither exists."""
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    # Windows
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+
+def try_lock_file(handle):
+    """Take a non-blocking exclusive lock on an open file; False if another process holds it"""
+    try:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock on the file at `path` (created if missing), waiting for it"""
+    with open(path, 'a+') as handle:
+        if fcntl:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        elif msvcrt:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            elif msvcrt:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,231 @@
+import os, json, time, logging, tempfile, threading
+from contextlib import contextmanager
+from config import HOT_REFRESH_HALF_LIFE, HOT_REFRESH_MIN_SCORE, HOT_REFRESH_AFTER, HOT_REFRESH_IDLE_SECONDS
+from config import HOT_REFRESH_CHECK_INTERVAL, HOT_REFRESH_MAX_PER_HOUR, HOT_REFRESH_QUOTA_RESERVE
+from config import HOT_PROFILES_FILE, HOT_REFRESH_LOCK_FILE
+from file_lock import locked, try_lock_file
+from linkedin_login import remaining_account_quota
+from profile_store import record_age
+
+logger = logging.getLogger(__name__)
+
+# Tracked profiles are capped; the coldest are forgotten first
+MAX_TRACKED_PROFILES = 10000
+
+class AccessTracker:
+    """How often and how recently each canonical profile URL is requested.
+
+    Each access adds 1 to a score that halves every HOT_REFRESH_HALF_LIFE
+    seconds. A profile used every day stays hot, and one analyzed in a
+    burst last month cools off.
+
+    Accesses are counted in memory and merged by flush() into a file shared
+    by every serving worker, so the hot set covers requests to all of them.
+    """
+
+    def __init__(self, half_life=HOT_REFRESH_HALF_LIFE, state_file=HOT_PROFILES_FILE):
+        self.half_life = half_life
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        self.entries = {}   # url -> [score, last_access, hits], since the last flush
+        self.merged = {}    # the same, for every worker, as of the last flush
+        self.last_active = 0.0
+
+    def _decayed(self, entry, now):
+        return entry[0] * 0.5 ** ((now - entry[1]) / self.half_life)
+
+    def _add(self, entries, url, entry, now):
+        current = entries.get(url)
+        if current is None:
+            entries[url] = list(entry)
+        else:
+            entries[url] = [self._decayed(current, now) + self._decayed(entry, now),
+                            max(current[1], entry[1]), current[2] + entry[2]]
+
+    def _trim(self, entries, now):
+        if len(entries) > MAX_TRACKED_PROFILES:
+            coldest = sorted(entries, key=lambda url: self._decayed(entries[url], now))
+            for url in coldest[:len(entries) - MAX_TRACKED_PROFILES]:
+                del entries[url]
+
+    def touch(self, profile_url):
+        now = time.time()
+        with self.lock:
+            self._add(self.entries, profile_url, [1.0, now, 1], now)
+            self.last_active = now
+            self._trim(self.entries, now)
+
+    def _load(self):
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read {self.state_file}: {e}")
+        return {}
+
+    def _save(self, state):
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        fd, tmp_file = tempfile.mkstemp(prefix='.hot-profiles-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception:
+            os.remove(tmp_file)
+            raise
+
+    def flush(self):
+        """Merge this process's accesses into the shared file and reload it.
+
+        Returns the latest access time seen by any worker.
+        """
+        now = time.time()
+        with self.lock:
+            entries, self.entries = self.entries, {}
+            last_active = self.last_active
+        try:
+            with locked(f"{self.state_file}.lock"):
+                state = self._load()
+                merged = state.get('profiles', {})
+                for url, entry in entries.items():
+                    self._add(merged, url, entry, now)
+                self._trim(merged, now)
+                last_active = max(last_active, state.get('last_active', 0.0))
+                if entries:
+                    self._save({'profiles': merged, 'last_active': last_active})
+        except Exception as e:
+            logger.warning(f"Could not share profile accesses: {e}")
+            # Keep the accesses for the next flush
+            with self.lock:
+                for url, entry in entries.items():
+                    self._add(self.entries, url, entry, now)
+            return last_active
+        with self.lock:
+            self.merged = merged
+        return last_active
+
+    def hottest(self, min_score=HOT_REFRESH_MIN_SCORE):
+        """[(url, score, hits)] above min_score as of the last flush, hottest first"""
+        now = time.time()
+        with self.lock:
+            scored = [(url, self._decayed(entry, now), entry[2]) for url, entry in self.merged.items()]
+        return sorted((item for item in scored if item[1] >= min_score), key=lambda item: -item[1])
+
+class HotProfileRefresher:
+    """Re-scrapes frequently analyzed profiles while the app is idle.
+
+    A profile is refreshed when it is hot and its stored copy is older than
+    HOT_REFRESH_AFTER. Refreshes run only after HOT_REFRESH_IDLE_SECONDS
+    without requests and at most HOT_REFRESH_MAX_PER_HOUR times an hour.
+    They also stop while the remaining account quota is below
+    HOT_REFRESH_QUOTA_RESERVE of capacity. User requests then find a fresh
+    stored profile (see ProfileStore.get_fresh) instead of waiting on a scrape.
+
+    Refreshes only run in serve mode, on this process's browser workers, so
+    they queue behind user scrapes on the same browser rather than opening
+    a profile directory a request may need. Every worker shares its
+    accesses (see AccessTracker.flush), and only the worker holding
+    HOT_REFRESH_LOCK_FILE refreshes.
+    """
+
+    def __init__(self, store, scrape, tracker=None, lock_file=HOT_REFRESH_LOCK_FILE):
+        self.store = store
+        self.scrape = scrape
+        self.tracker = tracker or AccessTracker()
+        self.lock_file = lock_file
+        self.leader_lock = None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.last_active = time.time()
+        self.refreshed_at = []
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    @contextmanager
+    def activity(self):
+        """Wrap user-facing work so refreshes wait for idle time"""
+        with self.lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.last_active = time.time()
+
+    def idle(self, shared_last_active=0.0):
+        """No request in flight here, and none started anywhere for HOT_REFRESH_IDLE_SECONDS"""
+        with self.lock:
+            last_active = max(self.last_active, shared_last_active)
+            return self.in_flight == 0 and time.time() - last_active >= HOT_REFRESH_IDLE_SECONDS
+
+    def has_browsers(self):
+        from browser_worker import get_browser_workers
+        return bool(get_browser_workers())
+
+    def lead(self):
+        """Whether this process is the one that refreshes; retried until a lock is won"""
+        if self.leader_lock is None:
+            handle = open(self.lock_file, "w")
+            if not try_lock_file(handle):
+                handle.close()
+                return False
+            self.leader_lock = handle
+            logger.info(f"Hot profile refresher is running in process {os.getpid()}")
+        return True
+
+    def quota_available(self):
+        remaining, capacity = remaining_account_quota()
+        return capacity > 0 and remaining > capacity * HOT_REFRESH_QUOTA_RESERVE
+
+    def due(self):
+        """Hot profiles whose stored copy is due for a refresh, hottest first"""
+        due = []
+        for url, score, hits in self.tracker.hottest():
+            record = self.store.get(url)
+            if record is not None and record_age(record) >= HOT_REFRESH_AFTER:
+                due.append((url, score, hits))
+        return due
+
+    def refresh_once(self):
+        """Refresh the hottest due profile if conditions allow; returns its URL"""
+        shared_last_active = self.tracker.flush()
+        if not self.has_browsers() or not self.lead():
+            return None
+        now = time.time()
+        self.refreshed_at = [t for t in self.refreshed_at if now - t < 3600]
+        if len(self.refreshed_at) >= HOT_REFRESH_MAX_PER_HOUR or not self.idle(shared_last_active):
+            return None
+        due = self.due()
+        if not due or not self.quota_available():
+            return None
+        url, score, hits = due[0]
+        logger.info(f"Refreshing hot profile {url} (score {score:.1f}, {hits} requests)")
+        self.refreshed_at.append(now)
+        try:
+            # Full field set so any analysis mode can be served from the store
+            if not self.scrape([(url, None)], store=self.store)[0]:
+                logger.warning(f"Background refresh of {url} failed")
+        except Exception as e:
+            logger.exception(f"Background refresh of {url} failed: {e}")
+        return url
+
+    def _run(self):
+        while not self.stop_event.wait(HOT_REFRESH_CHECK_INTERVAL):
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.exception(f"Hot profile refresher error: {e}")
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="hot-profile-refresher", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.leader_lock:
+            self.leader_lock.close()
+            self.leader_lock = None
@@ -1,41 +1,129 @@
-import time, random, logging, json, os, shutil
-from config import MAX_SCRAPE_PER_ACCOUNT
+import time, random, logging, json, os, shutil, tempfile, threading
+from contextlib import contextmanager
+from config import MAX_SCRAPE_PER_ACCOUNT, BROWSER_SERVER_ENDPOINT, BROWSER_SERVER_CONNECT_RETRIES, BROWSER_DISK_CACHE_MB
 from pathlib import Path
-from playwright.sync_api import sync_playwright
-import pyotp
+from selector_race import selector_race
+from memory_governor import driver_spawn_lock, child_pids
+from session_store import SessionPersistence
+from profile_maintenance import maintain_profile, lock_profile
+from file_lock import locked
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-automation",
+    "--disable-plugins-discovery",
+    f"--disk-cache-size={BROWSER_DISK_CACHE_MB * 1024 * 1024}",
+    f"--user-agent={USER_AGENT}"
+]
+
+DEFAULT_USER_DATA_DIR = Path("./playwright_user_data")
+
+# Concurrent scrapes in one process share account_state.json
+account_state_lock = threading.RLock()
+
+@contextmanager
+def account_state_locked(state_file):
+    """Hold account_state.json against other threads and serving processes
+    for a whole read-modify-write"""
+    with account_state_lock, locked(f"{state_file}.lock"):
+        yield
+
+def save_account_state(state, state_file):
+    """Write through a temp file, so readers never see a half-written state"""
+    fd, tmp_file = tempfile.mkstemp(prefix='.account-state-', suffix='.tmp',
+                                    dir=os.path.dirname(os.path.abspath(state_file)))
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, state_file)
+    except Exception:
+        os.remove(tmp_file)
+        raise
+
+def claim_profile_slot(max_slots=64):
+    """Claim the first browser profile directory no other scraper holds.
+
+    Returns (user_data_dir, lock_handle); the slot stays claimed until the
+    handle is closed. Slots are reused, so their logins survive restarts.
+    """
+    for slot in range(max_slots):
+        user_data_dir = Path(f"./playwright_user_data_{slot}")
+        handle = lock_profile(user_data_dir)
+        if handle:
+            return user_data_dir, handle
+    raise RuntimeError("No free browser profile slot")
+
+def remaining_account_quota(state_file="account_state.json"):
+    """(scrapes left before every account reaches MAX_SCRAPE_PER_ACCOUNT, total capacity)"""
+    with account_state_locked(state_file):
+        accounts_string = os.getenv("LINKEDIN_ACCOUNTS") or ""
+        emails = [pair.split(":")[0].strip() for pair in accounts_string.split(";") if ":" in pair]
+        usage = {}
+        try:
+            if os.path.exists(state_file):
+                with open(state_file, "r") as f:
+                    usage = json.load(f).get("usage", {})
+        except Exception as e:
+            logger.warning(f"Could not read account state: {e}")
+        capacity = len(emails) * MAX_SCRAPE_PER_ACCOUNT
+        used = sum(min(usage.get(email, 0), MAX_SCRAPE_PER_ACCOUNT) for email in emails)
+        return capacity - used, capacity
+
 class LinkedInLogin:
-    def __init__(self, headless):
+    def __init__(self, headless, user_data_dir=None, profile_lock=None):
+        """`profile_lock` is the caller's handle on the profile's lock (e.g. from
+        claim_profile_slot); without one the login tries to take it itself."""
         self.headless = headless
-        self.user_data_dir = Path("./playwright_user_data")
+        self.user_data_dir = Path(user_data_dir) if user_data_dir else DEFAULT_USER_DATA_DIR
+        self.profile_lock = profile_lock
+        self.own_profile_lock = None
         self.cookies_file = self.user_data_dir / "linkedin_cookies.json"
         self.user_data_dir.mkdir(exist_ok=True)
+        self.seed_cookies()
+        self.session = SessionPersistence(str(self.cookies_file))
         
         self.playwright = None
         self.browser = None
+        self.remote_browser = None
         self.page = None
+        self.driver_pids = set()
+        self.launch_stats = {}
         
         self.initialize_browser()
 
     def initialize_browser(self):
-        self.playwright = sync_playwright().start()
-
-        self.browser = self.playwright.chromium.launch_persistent_context(
-        user_data_dir=str(self.user_data_dir),
-        headless=self.headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--disable-dev-shm-usage",
-                "--no-sandbox",
-                "--disable-web-security",
-                "--disable-features=VizDisplayCompositor",
-                "--disable-automation",
-                "--disable-plugins-discovery",
-                "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            ]
-        )
+        # Imported on first use so modes that never open a browser don't load Playwright
+        from playwright.sync_api import sync_playwright
+        with driver_spawn_lock:
+            before = child_pids()
+            self.playwright = sync_playwright().start()
+            # The driver process (and the browser it spawns) belongs to this login
+            self.driver_pids = child_pids() - before
+
+        if BROWSER_SERVER_ENDPOINT and self.connect_browser_server():
+            self.browser = self.remote_browser.new_context(user_agent=USER_AGENT)
+        else:
+            # Our browser is not running yet; caches are only pruned if no other one holds the profile
+            if self.profile_lock is None:
+                self.profile_lock = self.own_profile_lock = lock_profile(self.user_data_dir)
+            self.launch_stats = maintain_profile(self.user_data_dir, locked=self.profile_lock is not None)
+            start = time.perf_counter()
+            self.browser = self.playwright.chromium.launch_persistent_context(
+                user_data_dir=str(self.user_data_dir),
+                headless=self.headless,
+                args=BROWSER_ARGS
+            )
+            self.launch_stats['launch_seconds'] = round(time.perf_counter() - start, 3)
+            logger.info(f"Browser launched in {self.launch_stats['launch_seconds']:.2f}s "
+                        f"(profile {self.launch_stats['profile_mb']} MB)")
 
         self.page = self.browser.pages[0] if self.browser.pages else self.browser.new_page()
         
@@ -48,15 +136,64 @@ class LinkedInLogin:
         
         self.load_cookies()
 
+    def connect_browser_server(self):
+        """Attach to the long-lived browser started with `app.py --mode browser-server`"""
+        for attempt in range(BROWSER_SERVER_CONNECT_RETRIES):
+            try:
+                self.remote_browser = self.playwright.chromium.connect_over_cdp(BROWSER_SERVER_ENDPOINT, timeout=5000)
+                logger.info(f"Connected to browser server at {BROWSER_SERVER_ENDPOINT}")
+                return True
+            except Exception as e:
+                logger.warning(f"Browser server connect attempt {attempt + 1}/{BROWSER_SERVER_CONNECT_RETRIES} failed: {e}")
+                time.sleep(2 ** attempt)
+        logger.error("Browser server unavailable, launching a local browser instead")
+        self.remote_browser = None
+        return False
+
+    def ensure_browser(self):
+        """Reconnect if the browser server restarted underneath us"""
+        if self.remote_browser is None or self.remote_browser.is_connected():
+            return
+        logger.warning("Lost connection to browser server, reconnecting...")
+        try:
+            self.playwright.stop()
+        except Exception:
+            pass
+        self.initialize_browser()
+
+    def seed_cookies(self):
+        """Start a separate browser profile from the default profile's saved login"""
+        default_cookies = DEFAULT_USER_DATA_DIR / "linkedin_cookies.json"
+        if self.user_data_dir != DEFAULT_USER_DATA_DIR and not self.cookies_file.exists() and default_cookies.exists():
+            shutil.copyfile(default_cookies, self.cookies_file)
+            logger.info(f"Seeded cookies for {self.user_data_dir} from default profile")
+
+    def recycle(self):
+        """Replace the browser context to release accumulated memory, keeping the login"""
+        try:
+            self.save_cookies()
+            if self.browser:
+                self.browser.close()
+            if self.remote_browser:
+                self.remote_browser.close()
+            if self.playwright:
+                self.playwright.stop()
+        except Exception as e:
+            logger.exception(f"Error closing browser for recycle: {e}")
+        self.remote_browser = None
+        # initialize_browser reloads the saved cookies
+        self.initialize_browser()
+
     def save_cookies(self):
         try:
             cookies = self.page.context.cookies()
             linkedin_cookies = [c for c in cookies if 'linkedin' in c.get('domain', '')]
             
             if linkedin_cookies:
-                with open(self.cookies_file, 'w') as f:
-                    json.dump(linkedin_cookies, f, indent=2)
-                logger.info(f"Saved {len(linkedin_cookies)} cookies")
+                if self.session.save(linkedin_cookies):
+                    logger.info(f"Saved {len(linkedin_cookies)} cookies")
+                else:
+                    logger.info("Cookies unchanged, skipping save")
                 return True
             return False
         except Exception as e:
@@ -65,13 +202,14 @@ class LinkedInLogin:
 
     def load_cookies(self):
         try:
-            if not self.cookies_file.exists():
-                return False
-            
-            with open(self.cookies_file, 'r') as f:
-                cookies = json.load(f)
+            cookies = self.session.load()
             
             if cookies:
+                context_cookies = [c for c in self.page.context.cookies() if 'linkedin' in c.get('domain', '')]
+                if self.session.is_current(context_cookies):
+                    # The persistent profile already holds this session
+                    logger.info("Browser cookies already current, skipping reload")
+                    return True
                 try:
                     self.page.context.clear_cookies()
                 except:
@@ -140,14 +278,10 @@ class LinkedInLogin:
                 "nav.global-nav",
             ]
             
-            for selector in selectors:
-                try:
-                    element = self.page.query_selector(selector)
-                    if element:
-                        logger.info(f"Detected logged in via element: {selector}")
-                        return True
-                except:
-                    continue
+            selector, element = selector_race.resolve(self.page, "logged_in", selectors)
+            if element:
+                logger.info(f"Detected logged in via element: {selector}")
+                return True
             
             logger.info("No logged-in indicators found")
             return False
@@ -263,40 +397,16 @@ class LinkedInLogin:
                 "input[id*='pin']"
             ]
             
-            # First, let's debug what's actually on the page
-            logger.info("Debugging: Looking for OTP input field...")
-            
-            # Check if we're on the right page
-            page_content = self.page.content()
-            if "verification" in page_content.lower() or "pin" in page_content.lower():
+            # Check if we're on the right page without pulling the HTML across
+            if self.page.evaluate("() => /verification|pin/i.test(document.documentElement.innerHTML)"):
                 logger.info("Detected verification/PIN page")
             else:
                 logger.warning("May not be on OTP verification page")
             
-            # Try to find the form__content div first
-            form_content = None
-            try:
-                form_content = self.page.wait_for_selector("div.form__content", timeout=5000)
-                if form_content:
-                    logger.info("Found form__content div")
-                else:
-                    logger.warning("form__content div not found")
-            except:
-                logger.warning("form__content div not found")
-            
-            # Now try to find the OTP input
-            otp_input = None
-            
-            for i, selector in enumerate(otp_selectors):
-                try:
-                    logger.info(f"Trying selector {i+1}/{len(otp_selectors)}: {selector}")
-                    otp_input = self.page.wait_for_selector(selector, timeout=2000)
-                    if otp_input:
-                        logger.info(f"Found OTP input field")
-                        break
-                except Exception as e:
-                    logger.debug(f"Selector failed: {selector} - {str(e)}")
-                    continue
+            # Race all OTP input selectors in a single wait
+            selector, otp_input = selector_race.resolve(self.page, "otp_input", otp_selectors, timeout=10000)
+            if otp_input:
+                logger.info(f"Found OTP input field via {selector}")
             
             if not otp_input:
                 logger.error("Could not find OTP input field with any selector")
@@ -324,15 +434,9 @@ class LinkedInLogin:
                 "button:has-text('Continue')"
             ]
             
-            submit_button = None
-            for selector in submit_selectors:
-                try:
-                    submit_button = self.page.query_selector(selector)
-                    if submit_button:
-                        logger.info(f"Found submit button: {selector}")
-                        break
-                except:
-                    continue
+            selector, submit_button = selector_race.resolve(self.page, "otp_submit", submit_selectors)
+            if submit_button:
+                logger.info(f"Found submit button: {selector}")
             
             if submit_button:
                 logger.info("Clicking submit button")
@@ -354,132 +458,133 @@ class LinkedInLogin:
         if not secret:
             logger.exception(f"Secret not found for: {email}")
             return None
+        import pyotp
         totp = pyotp.TOTP(secret)
         otp_code = totp.now()
         return otp_code
 
     def rotate_account(self, state_file="account_state.json", increment=True):
         """Rotate to next available account with proper state management"""
-        accounts_string = str(os.getenv("LINKEDIN_ACCOUNTS"))
-        max_usage = MAX_SCRAPE_PER_ACCOUNT
-        accounts = [{"email": e.strip(), "password": p.strip()} 
-                    for e, p in (pair.split(":") for pair in accounts_string.split(";"))]
-
-        # Load or initialize state
-        if os.path.exists(state_file):
-            with open(state_file, "r") as f:
-                state = json.load(f)
-            
-            # Clean up old format if exists (migrate to new format)
-            if "usage" not in state:
-                # Old format detected - migrate to new format
-                logger.info("Migrating state file to new format...")
-                old_state = {k: v for k, v in state.items() 
-                            if k not in ["last_account_index", "current_account"]}
+        with account_state_locked(state_file):
+            accounts_string = str(os.getenv("LINKEDIN_ACCOUNTS"))
+            max_usage = MAX_SCRAPE_PER_ACCOUNT
+            accounts = [{"email": e.strip(), "password": p.strip()} 
+                        for e, p in (pair.split(":") for pair in accounts_string.split(";"))]
+
+            # Load or initialize state
+            if os.path.exists(state_file):
+                with open(state_file, "r") as f:
+                    state = json.load(f)
+            
+                # Clean up old format if exists (migrate to new format)
+                if "usage" not in state:
+                    # Old format detected - migrate to new format
+                    logger.info("Migrating state file to new format...")
+                    old_state = {k: v for k, v in state.items() 
+                                if k not in ["last_account_index", "current_account"]}
+                    state = {
+                        "usage": old_state,
+                        "last_account_index": state.get("last_account_index", -1),
+                        "current_account": state.get("current_account")
+                    }
+                else:
+                    # Remove any duplicate keys from old format
+                    keys_to_keep = ["usage", "last_account_index", "current_account"]
+                    state = {k: v for k, v in state.items() if k in keys_to_keep}
+            else:
                 state = {
-                    "usage": old_state,
-                    "last_account_index": state.get("last_account_index", -1),
-                    "current_account": state.get("current_account")
+                    "usage": {acc["email"]: 0 for acc in accounts},
+                    "last_account_index": -1,
+                    "current_account": None
                 }
-            else:
-                # Remove any duplicate keys from old format
-                keys_to_keep = ["usage", "last_account_index", "current_account"]
-                state = {k: v for k, v in state.items() if k in keys_to_keep}
-        else:
-            state = {
-                "usage": {acc["email"]: 0 for acc in accounts},
-                "last_account_index": -1,
-                "current_account": None
-            }
         
-        usage_dict = state["usage"]
-        last_index = state.get("last_account_index", -1)
-        current_account = state.get("current_account")
+            usage_dict = state["usage"]
+            last_index = state.get("last_account_index", -1)
+            current_account = state.get("current_account")
         
-        # Check if all accounts reached max_usage
-        if all(usage_dict.get(acc["email"], 0) >= max_usage for acc in accounts):
-            logger.info("All accounts reached max usage. Resetting all counters.")
-            usage_dict = {acc["email"]: 0 for acc in accounts}
-            last_index = -1
-            current_account = None
+            # Check if all accounts reached max_usage
+            if all(usage_dict.get(acc["email"], 0) >= max_usage for acc in accounts):
+                logger.info("All accounts reached max usage. Resetting all counters.")
+                usage_dict = {acc["email"]: 0 for acc in accounts}
+                last_index = -1
+                current_account = None
         
-        # Start from the next account after the last used one
-        start_index = (last_index + 1) % len(accounts)
+            # Start from the next account after the last used one
+            start_index = (last_index + 1) % len(accounts)
         
-        # Try each account starting from start_index
-        for i in range(len(accounts)):
-            current_index = (start_index + i) % len(accounts)
-            acc = accounts[current_index]
-            email = acc["email"]
-            usage = usage_dict.get(email, 0)
-
-            if usage >= max_usage:
-                logger.info(f"Account {email} reached max usage ({usage}/{max_usage}). Trying next account.")
-                continue
-            
-            # Found available account
-            if increment:
-                usage_dict[email] = usage + 1
-                logger.info(f"Using account: {email} (Usage: {usage_dict[email]}/{max_usage})")
-            else:
-                logger.info(f"Selected account: {email} (Current usage: {usage}/{max_usage})")
+            # Try each account starting from start_index
+            for i in range(len(accounts)):
+                current_index = (start_index + i) % len(accounts)
+                acc = accounts[current_index]
+                email = acc["email"]
+                usage = usage_dict.get(email, 0)
+
+                if usage >= max_usage:
+                    logger.info(f"Account {email} reached max usage ({usage}/{max_usage}). Trying next account.")
+                    continue
             
-            # Update state with ONLY the new format keys
-            state = {
-                "usage": usage_dict,
-                "last_account_index": current_index,
-                "current_account": email
-            }
+                # Found available account
+                if increment:
+                    usage_dict[email] = usage + 1
+                    logger.info(f"Using account: {email} (Usage: {usage_dict[email]}/{max_usage})")
+                else:
+                    logger.info(f"Selected account: {email} (Current usage: {usage}/{max_usage})")
             
-            # Save updated state
-            with open(state_file, "w") as f:
-                json.dump(state, f, indent=2)
+                # Update state with ONLY the new format keys
+                state = {
+                    "usage": usage_dict,
+                    "last_account_index": current_index,
+                    "current_account": email
+                }
+            
+                # Save updated state
+                save_account_state(state, state_file)
 
-            return acc["email"], acc["password"], usage
+                return acc["email"], acc["password"], usage
     
-        # If we reach here, no accounts available
-        raise Exception("All accounts exhausted.")
+            # If we reach here, no accounts available
+            raise Exception("All accounts exhausted.")
 
     def increment_account_usage(self, email, state_file="account_state.json"):
         """Increment usage counter for an account"""
-        try:
-            if os.path.exists(state_file):
-                with open(state_file, "r") as f:
-                    state = json.load(f)
-            else:
-                state = {
-                    "usage": {},
-                    "last_account_index": -1,
-                    "current_account": None
+        with account_state_locked(state_file):
+            try:
+                if os.path.exists(state_file):
+                    with open(state_file, "r") as f:
+                        state = json.load(f)
+                else:
+                    state = {
+                        "usage": {},
+                        "last_account_index": -1,
+                        "current_account": None
+                    }
+            
+                # Handle both old and new format
+                if "usage" in state:
+                    # New format
+                    usage_dict = state["usage"]
+                    usage_dict[email] = usage_dict.get(email, 0) + 1
+                    state["usage"] = usage_dict
+                else:
+                    # Old format - migrate
+                    state["usage"] = {email: state.get(email, 0) + 1}
+                    # Remove old keys
+                    if email in state:
+                        del state[email]
+            
+                # Save with clean format (only these 3 keys)
+                clean_state = {
+                    "usage": state["usage"],
+                    "last_account_index": state.get("last_account_index", -1),
+                    "current_account": state.get("current_account", email)
                 }
             
-            # Handle both old and new format
-            if "usage" in state:
-                # New format
-                usage_dict = state["usage"]
-                usage_dict[email] = usage_dict.get(email, 0) + 1
-                state["usage"] = usage_dict
-            else:
-                # Old format - migrate
-                state["usage"] = {email: state.get(email, 0) + 1}
-                # Remove old keys
-                if email in state:
-                    del state[email]
-            
-            # Save with clean format (only these 3 keys)
-            clean_state = {
-                "usage": state["usage"],
-                "last_account_index": state.get("last_account_index", -1),
-                "current_account": state.get("current_account", email)
-            }
-            
-            with open(state_file, "w") as f:
-                json.dump(clean_state, f, indent=2)
+                save_account_state(clean_state, state_file)
             
-            logger.info(f"Incremented usage for {email}: {clean_state['usage'][email]}")
+                logger.info(f"Incremented usage for {email}: {clean_state['usage'][email]}")
             
-        except Exception as e:
-            logger.exception(f"Failed to increment account usage: {e}")
+            except Exception as e:
+                logger.exception(f"Failed to increment account usage: {e}")
         
     def clear_browser_data(self):
         try:
@@ -519,16 +624,21 @@ class LinkedInLogin:
             return False
 
     def ensure_logged_in(self, profile_url, max_login_retries=3):
+        self.ensure_browser()
+
         # Check if we have a current valid account
         state_file = "account_state.json"
         current_account_email = None
         current_account_password = None
         
         try:
-            if os.path.exists(state_file):
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                
+            with account_state_locked(state_file):
+                state = None
+                if os.path.exists(state_file):
+                    with open(state_file, 'r') as f:
+                        state = json.load(f)
+
+            if state:
                 current_account = state.get("current_account")
                 
                 if current_account:
@@ -619,8 +729,14 @@ class LinkedInLogin:
 
             if self.browser:
                 self.browser.close()
+            if self.remote_browser:
+                # Only disconnects, the server keeps running
+                self.remote_browser.close()
             if self.playwright: 
                 self.playwright.stop()
+            if self.own_profile_lock:
+                self.own_profile_lock.close()
+                self.profile_lock = self.own_profile_lock = None
             
             logger.info("Browser closed successfully.") 
 
@@ -0,0 +1,279 @@
+"""Offline load test for the web app.
+
+Boots create_flask_app with a fixture-backed fake scraper and a fake
+Gemini client, drives concurrent /analyze clients through Flask's test
+client and reports throughput, latency percentiles and error rate per
+stage. Nothing touches LinkedIn or Gemini.
+
+    python loadtest.py --clients 20 --requests 400 --scrape-latency 2 --llm-latency 3 --llm-error-rate 0.02
+
+Every request asks for a profile URL not seen before, so each one goes
+through the scraper rather than the stored-profile cache. --cache-hits
+draws URLs from a pool of --profiles instead, to measure a warm cache.
+
+Responses are replayed from a recordings file ({prompt sha256: response
+text}); prompts without a recording get a canned JSON reply. Recordings
+can be captured from the real API with --record (needs GEMINI_API_KEY
+and network access).
+"""
+import os, sys, json, time, random, hashlib, argparse, itertools, logging, tempfile, threading, statistics
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURES = [
+    {
+        'name': 'Ada Fixture',
+        'headline': 'Staff Data Engineer at Example Analytics',
+        'about': 'Builds streaming data platforms and mentors engineers.',
+        'experience': [{'title': 'Staff Data Engineer', 'company': 'Example Analytics', 'duration': '2020 - Present'},
+                       {'title': 'Data Engineer', 'company': 'Sample Bank', 'duration': '2016 - 2020'}],
+        'education': [{'school': 'Fixture University', 'degree': 'BSc', 'field': 'Computer Science', 'year': '2012 - 2016'}],
+        'skills': ['Python', 'Kafka', 'Spark', 'SQL', 'Airflow'],
+        'certifications': [{'certificate': 'Cloud Data Engineer', 'link': '', 'issuer': 'Example Cloud', 'date': '2022'}],
+    },
+    {
+        'name': 'Grace Fixture',
+        'headline': 'Product Manager, Payments',
+        'about': 'Ships payment products across web and mobile.',
+        'experience': [{'title': 'Senior Product Manager', 'company': 'Fintech One', 'duration': '2019 - Present'}],
+        'education': [{'school': 'Business School', 'degree': 'MBA', 'field': 'Business', 'year': '2017 - 2019'}],
+        'skills': ['Product Strategy', 'Payments', 'Agile'],
+        'certifications': [],
+    },
+]
+
+# Canned replies per analysis mode, recognised from the prompt text
+CANNED_RESPONSES = {
+    'intelligence brief': {'who_they_are': 'Load test fixture', 'what_they_specialize_in': '', 'seniority_level': 'Senior',
+                           'key_strengths': ['Fixtures'], 'career_trajectory': '', 'potential_talking_points': ''},
+    'outreach angles': {'outreach_angles': [{'angle_type': 'Fixture angle', 'explanation': 'Load test reply'}],
+                        'personalized_messages': {'casual_connect': 'Hi!', 'value_first_connect': '', 'recruiting_outreach': '',
+                                                  'sales_outreach': '', 'mentorship_ask': '', 'collaboration_proposal': ''}},
+    'compatibility score': {'compatibility_score': 50, 'why': ['Load test reply'], 'recommendation': 'Yes'},
+}
+
+def prompt_hash(prompt):
+    return hashlib.sha256(str(prompt).encode('utf-8')).hexdigest()
+
+class Recorder:
+    """Thread-safe latency and error samples per stage"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, stage, seconds, ok=True):
+        with self.lock:
+            self.latencies[stage].append(seconds)
+            if not ok:
+                self.errors[stage] += 1
+
+    def report(self, elapsed):
+        lines = [f"{'stage':<12}{'count':>7}{'rate/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}"]
+        for stage, samples in self.latencies.items():
+            p50, p95, p99 = percentiles(samples, (50, 95, 99))
+            error_rate = self.errors[stage] / len(samples)
+            lines.append(f"{stage:<12}{len(samples):>7}{len(samples) / elapsed:>9.1f}"
+                         f"{p50 * 1000:>9.0f}{p95 * 1000:>9.0f}{p99 * 1000:>9.0f}{error_rate:>9.1%}")
+        return "\n".join(lines)
+
+def percentiles(samples, points):
+    if len(samples) == 1:
+        return [samples[0]] * len(points)
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return [cuts[p - 1] if p < 100 else max(samples) for p in points]
+
+def _sleep(latency, jitter):
+    if latency > 0:
+        time.sleep(max(0.0, random.gauss(latency, latency * jitter)))
+
+class FakeScraper:
+    """Stands in for app.scrape_profiles: serves fixture profiles after a
+    configurable delay, publishing sections as the real scraper does"""
+
+    def __init__(self, fixtures, latency=1.0, jitter=0.2, recorder=None):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.recorder = recorder
+
+    def __call__(self, jobs, store=None, on_section=None):
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            return list(executor.map(lambda job: self.scrape(*job, store=store, on_section=on_section), jobs))
+
+    def scrape(self, profile_url, fields=None, store=None, on_section=None):
+        start = time.perf_counter()
+        fixture = self.fixtures[int(hashlib.sha1(profile_url.encode('utf-8')).hexdigest(), 16) % len(self.fixtures)]
+        sections = [k for k in fixture if k != 'url' and (fields is None or k in fields or k in ('name', 'headline', 'about'))]
+        profile_data = {}
+        for section in sections:
+            _sleep(self.latency / len(sections), self.jitter)
+            profile_data[section] = fixture[section]
+            if on_section:
+                on_section(profile_url, section, fixture[section])
+        profile_data['url'] = profile_url
+        if store:
+            store.put(profile_url, profile_data)
+        if self.recorder:
+            self.recorder.record('scrape', time.perf_counter() - start)
+        return profile_data
+
+class _FakeUsage:
+    """Rough token counts (about 4 characters per token) so usage accounting sees traffic"""
+
+    def __init__(self, prompt, text):
+        self.prompt_token_count = len(str(prompt)) // 4
+        self.candidates_token_count = len(text) // 4
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+class _FakeResponse:
+    candidates = None
+
+    def __init__(self, text, prompt=''):
+        self.text = text
+        self.usage_metadata = _FakeUsage(prompt, text)
+
+class _FakeModels:
+    def __init__(self, client):
+        self.client = client
+
+    def generate_content(self, model, contents, config=None):
+        return self.client.generate(contents)
+
+class FakeGenaiClient:
+    """Stands in for genai.Client: replays recorded responses keyed by
+    prompt hash, with configurable latency and error rate"""
+
+    def __init__(self, recordings=None, latency=1.0, jitter=0.2, error_rate=0.0, recorder=None):
+        self.recordings = recordings or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.recorder = recorder
+        self.models = _FakeModels(self)
+
+    def generate(self, prompt):
+        start = time.perf_counter()
+        _sleep(self.latency, self.jitter)
+        failed = random.random() < self.error_rate
+        if self.recorder:
+            self.recorder.record('llm', time.perf_counter() - start, ok=not failed)
+        if failed:
+            raise RuntimeError("Injected Gemini error")
+        text = self.recordings.get(prompt_hash(prompt))
+        if text is None:
+            reply = next((r for marker, r in CANNED_RESPONSES.items() if marker in str(prompt)), {'raw_text': 'fixture'})
+            text = json.dumps(reply)
+        return _FakeResponse(text, prompt)
+
+class RecordingClient:
+    """Wraps a real genai.Client and saves every response under its prompt hash"""
+
+    def __init__(self, client, path):
+        self.client = client
+        self.path = path
+        self.lock = threading.Lock()
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        response = self.client.models.generate_content(model=model, contents=contents, config=config)
+        with self.lock:
+            recordings = load_json(self.path, {})
+            recordings[prompt_hash(contents)] = response.text
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(recordings, f, indent=2)
+        return response
+
+def load_json(path, default):
+    if not path or not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def run_client(client, recorder, next_url, modes, count):
+    for _ in range(count):
+        mode = random.choice(modes)
+        form = {'profile_url': next_url(), 'analysis_mode': mode}
+        if mode == 'compatibility_score':
+            form['user_url'] = next_url()
+
+        start = time.perf_counter()
+        response = client.post('/analyze', data=form)
+        ok = response.status_code == 303
+        recorder.record('analyze', time.perf_counter() - start, ok=ok)
+        if not ok:
+            continue
+
+        start = time.perf_counter()
+        response = client.get(response.headers['Location'])
+        recorder.record('result', time.perf_counter() - start, ok=response.status_code == 200)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test with fake scraper and Gemini stand-ins")
+    parser.add_argument("--clients", type=int, default=10, help="Concurrent /analyze clients")
+    parser.add_argument("--requests", type=int, default=100, help="Total /analyze requests")
+    parser.add_argument("--cache-hits", action="store_true",
+                        help="Repeat URLs from a pool of --profiles, so repeats are served from the profile cache")
+    parser.add_argument("--profiles", type=int, default=50, help="Distinct profile URLs to request with --cache-hits")
+    parser.add_argument("--modes", default="about_profile,approach_person,compatibility_score")
+    parser.add_argument("--fixtures", help="JSON list of profile dicts served by the fake scraper")
+    parser.add_argument("--recordings", help="JSON {prompt sha256: response text} replayed by the fake client")
+    parser.add_argument("--scrape-latency", type=float, default=1.0, help="Mean seconds per fake scrape")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Mean seconds per fake Gemini call")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of Gemini calls that fail")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency standard deviation, relative to the mean")
+    parser.add_argument("--record", action="store_true",
+                        help="Call the real Gemini API and save responses to --recordings instead of replaying")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    if args.record and not args.recordings:
+        parser.error("--record requires --recordings")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    recordings_path = os.path.abspath(args.recordings) if args.recordings else None
+    fixtures = load_json(args.fixtures, DEFAULT_FIXTURES)
+    # Stores and indexes are written relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="loadtest-"))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from app import create_flask_app
+    # After the import, which runs config's logging.basicConfig(level=INFO);
+    # per-request INFO logging would inflate the measured latencies
+    logging.getLogger().setLevel(logging.WARNING)
+
+    recorder = Recorder()
+    if args.record:
+        from google import genai
+        genai_client = RecordingClient(genai.Client(api_key=os.getenv("GEMINI_API_KEY")), recordings_path)
+    else:
+        genai_client = FakeGenaiClient(load_json(recordings_path, {}), latency=args.llm_latency, jitter=args.jitter,
+                                       error_rate=args.llm_error_rate, recorder=recorder)
+    scrape = FakeScraper(fixtures, latency=args.scrape_latency, jitter=args.jitter, recorder=recorder)
+    app = create_flask_app(scrape=scrape, genai_client=genai_client)
+    app.secret_key = app.secret_key or "loadtest"
+
+    if args.cache_hits:
+        urls = [f"https://www.linkedin.com/in/loadtest-{i}" for i in range(args.profiles)]
+        next_url = lambda: random.choice(urls)
+    else:
+        counter = itertools.count()
+        next_url = lambda: f"https://www.linkedin.com/in/loadtest-{next(counter)}"
+    modes = args.modes.split(',')
+    per_client = [args.requests // args.clients + (i < args.requests % args.clients) for i in range(args.clients)]
+
+    print(f"Running {args.requests} requests from {args.clients} clients in {os.getcwd()}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as executor:
+        futures = [executor.submit(run_client, app.test_client(), recorder, next_url, modes, n) for n in per_client if n]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    print(f"\nCompleted in {elapsed:.1f}s\n")
+    print(recorder.report(elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os, logging, threading
+from config import BROWSER_RECYCLE_SCRAPES, BROWSER_RECYCLE_RSS_MB
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Serialises driver launches so new child processes can be attributed to one browser
+driver_spawn_lock = threading.Lock()
+
+def _children_map():
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, so split after its closing paren
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+def child_pids(pid=None):
+    """Direct child processes of pid (default: this process)"""
+    pid = pid or os.getpid()
+    if psutil:
+        try:
+            return {p.pid for p in psutil.Process(pid).children()}
+        except psutil.Error:
+            return set()
+    if not os.path.isdir('/proc'):
+        return set()
+    return set(_children_map().get(pid, []))
+
+def process_tree(pids):
+    """The given processes plus all their descendants"""
+    if psutil:
+        tree = set()
+        for pid in pids:
+            try:
+                tree.add(pid)
+                tree.update(p.pid for p in psutil.Process(pid).children(recursive=True))
+            except psutil.Error:
+                continue
+        return tree
+    if not os.path.isdir('/proc'):
+        return set()
+    children = _children_map()
+    tree, stack = set(), list(pids)
+    while stack:
+        pid = stack.pop()
+        if pid not in tree:
+            tree.add(pid)
+            stack.extend(children.get(pid, []))
+    return tree
+
+def rss_mb(pids):
+    """Total resident memory of the processes, in MB (None if unavailable)"""
+    total = 0
+    found = False
+    for pid in pids:
+        try:
+            if psutil:
+                total += psutil.Process(pid).memory_info().rss
+            else:
+                with open(f'/proc/{pid}/status') as f:
+                    for line in f:
+                        if line.startswith('VmRSS:'):
+                            total += int(line.split()[1]) * 1024
+                            break
+            found = True
+        except Exception:
+            continue
+    return round(total / (1024 * 1024), 1) if found else None
+
+class MemoryGovernor:
+    """Samples browser memory after each scrape and recycles the browser
+    context after too many scrapes or when RSS crosses the threshold"""
+
+    def __init__(self, max_scrapes=BROWSER_RECYCLE_SCRAPES, max_rss_mb=BROWSER_RECYCLE_RSS_MB):
+        self.max_scrapes = max_scrapes
+        self.max_rss_mb = max_rss_mb
+        self.scrapes = 0
+
+    def sample(self, auth):
+        """RSS of the Playwright driver and browser processes owned by auth"""
+        return rss_mb(process_tree(auth.driver_pids))
+
+    def after_scrape(self, auth):
+        self.scrapes += 1
+        rss = self.sample(auth)
+        stats = {'rss_mb': rss, 'scrapes_since_recycle': self.scrapes, 'recycled': False}
+        if auth.launch_stats:
+            stats['launch'] = auth.launch_stats
+
+        reason = None
+        if self.max_scrapes and self.scrapes >= self.max_scrapes:
+            reason = f"{self.scrapes} scrapes"
+        elif self.max_rss_mb and rss is not None and rss >= self.max_rss_mb:
+            reason = f"RSS {rss} MB >= {self.max_rss_mb} MB"
+
+        if reason:
+            logger.info(f"Recycling browser context after {reason}")
+            auth.recycle()
+            self.scrapes = 0
+            stats['recycled'] = True
+            stats['rss_after_mb'] = self.sample(auth)
+        logger.info(f"Browser memory: {stats}")
+        return stats
@@ -0,0 +1,63 @@
+import time, logging, threading
+from collections import deque
+from config import MODEL_ROUTES, DEFAULT_MODEL_ROUTE, MODEL_DEMOTE_P95_MS, MODEL_DEMOTE_ERROR_RATE
+from config import MODEL_HEALTH_WINDOW, MODEL_HEALTH_MIN_CALLS, MODEL_DEMOTE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class ModelRouter:
+    """Chooses the Gemini models to try for each analysis mode.
+
+    Every mode has a chain of models, cheapest first (config.MODEL_ROUTES).
+    The analyzer moves down the chain when a call fails or its output does
+    not validate. Recent latency and errors are tracked per model. A model
+    whose p95 latency or error rate crosses a threshold is demoted to the
+    back of every chain for a cooldown. Its window is then cleared so it
+    gets a fresh chance.
+    """
+
+    def __init__(self, routes=None, default_route=None):
+        self.routes = routes or MODEL_ROUTES
+        self.default_route = default_route or DEFAULT_MODEL_ROUTE
+        self.lock = threading.Lock()
+        self.calls = {}           # model -> deque of (latency_ms, ok)
+        self.demoted_until = {}   # model -> timestamp
+
+    def chain(self, mode):
+        """(models to try in order, models currently demoted)"""
+        route = list(self.routes.get(mode, self.default_route))
+        now = time.time()
+        with self.lock:
+            demoted = [m for m in route if self.demoted_until.get(m, 0) > now]
+        if len(demoted) == len(route):
+            return route, demoted
+        return [m for m in route if m not in demoted] + demoted, demoted
+
+    def record(self, model, latency_ms, ok):
+        with self.lock:
+            calls = self.calls.setdefault(model, deque(maxlen=MODEL_HEALTH_WINDOW))
+            calls.append((latency_ms, ok))
+            if len(calls) < MODEL_HEALTH_MIN_CALLS or self.demoted_until.get(model, 0) > time.time():
+                return
+            latencies = sorted(latency for latency, _ in calls)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            error_rate = sum(1 for _, call_ok in calls if not call_ok) / len(calls)
+            if p95 > MODEL_DEMOTE_P95_MS or error_rate > MODEL_DEMOTE_ERROR_RATE:
+                logger.warning(f"Demoting {model} for {MODEL_DEMOTE_SECONDS}s: "
+                               f"p95 {p95} ms, error rate {error_rate:.0%} over {len(calls)} calls")
+                self.demoted_until[model] = time.time() + MODEL_DEMOTE_SECONDS
+                calls.clear()
+
+    def health(self):
+        now = time.time()
+        with self.lock:
+            return {
+                model: {
+                    'recent_calls': len(calls),
+                    'errors': sum(1 for _, ok in calls if not ok),
+                    'demoted': self.demoted_until.get(model, 0) > now,
+                }
+                for model, calls in self.calls.items()
+            }
+
+model_router = ModelRouter()
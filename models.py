@@ -0,0 +1,150 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Placeholders older scrapes stored in place of missing values
+PLACEHOLDERS = {'Degree', 'Field of Study', 'Year', 'Link to Certificate', 'Issued By __', 'Issued Date'}
+
+def dumps(obj, sort_keys=False):
+    """Compact JSON as bytes, using orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _clean(value):
+    value = (value or '').strip() if isinstance(value, str) else value
+    return '' if value in PLACEHOLDERS else (value or '')
+
+class _Record:
+    """Slots-based record with dict-style access for templates and older callers"""
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for field in self.__slots__:
+            setattr(self, field, _clean(kwargs.get(field)))
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+class Experience(_Record):
+    __slots__ = ('title', 'company', 'duration')
+
+class Education(_Record):
+    __slots__ = ('school', 'degree', 'field', 'year')
+
+    @classmethod
+    def from_dict(cls, data):
+        # Sample data describes education as a plain degree string
+        if isinstance(data, str):
+            return cls(degree=data)
+        return super().from_dict(data)
+
+class Certification(_Record):
+    __slots__ = ('certificate', 'link', 'issuer', 'date')
+
+class ProfileSummary(_Record):
+    """What the search and similar-profile indexes keep in memory per profile"""
+    __slots__ = ('name', 'headline', 'url')
+
+class Profile:
+    """A scraped profile. List sections are None when they were not scraped
+    (see scraper.resolve_detail_sections) and are then left out of to_dict()."""
+
+    __slots__ = ('name', 'headline', 'about', 'experience', 'education', 'certifications', 'skills', 'url')
+
+    SECTION_TYPES = {'experience': Experience, 'education': Education, 'certifications': Certification}
+
+    def __init__(self, name='', headline='', about='', experience=None, education=None,
+                 certifications=None, skills=None, url=''):
+        self.name = name or ''
+        self.headline = headline or ''
+        self.about = about or ''
+        self.experience = experience
+        self.education = education
+        self.certifications = certifications
+        self.skills = skills
+        self.url = url or ''
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        kwargs = {k: data.get(k) for k in ('name', 'headline', 'about', 'url')}
+        for section, record_type in cls.SECTION_TYPES.items():
+            if data.get(section) is not None:
+                kwargs[section] = [record_type.from_dict(item) for item in data[section]]
+        if data.get('skills') is not None:
+            kwargs['skills'] = [str(skill) for skill in data['skills']]
+        return cls(**kwargs)
+
+    def to_dict(self):
+        data = {'name': self.name, 'headline': self.headline, 'about': self.about}
+        for section in ('education', 'certifications', 'experience'):
+            items = getattr(self, section)
+            if items is not None:
+                data[section] = [item.to_dict() for item in items]
+        if self.skills is not None:
+            data['skills'] = list(self.skills)
+        data['url'] = self.url
+        return data
+
+    def to_json(self):
+        return dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, data):
+        return cls.from_dict(loads(data))
+
+    # Dict-style access keeps templates and dict-based callers working
+    def get(self, key, default=None):
+        if key not in self.__slots__:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        if key not in self.__slots__ or getattr(self, key) is None:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __eq__(self, other):
+        return isinstance(other, Profile) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Profile({self.name!r}, {self.url!r})"
+
+def normalize_profile(data):
+    """Round-trip a profile dict through the model: drops placeholders and
+    gives sample data the same shape as scraped data"""
+    return Profile.from_dict(data).to_dict()
@@ -0,0 +1,77 @@
+import logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from summarizer import analyze_profile, MODE_FIELDS, ALL_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Shared by all pipelines so speculative generations are bounded per process
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-analysis")
+
+class PipelinedAnalysis:
+    """Starts an analysis while the profile is still being scraped.
+
+    Sections are published one by one (see LinkedInScraper.scrape_profile's
+    `on_section`). As soon as every field the mode needs is available,
+    either scraped already or predicted from the stored profile, the
+    analysis is started speculatively. When the scrape finishes, the
+    speculative result is kept if the fields it used match the final data,
+    and regenerated otherwise.
+    """
+
+    def __init__(self, profile_url, mode, predicted=None, **analyze_kwargs):
+        self.profile_url = profile_url
+        self.mode = mode
+        self.fields = MODE_FIELDS.get(mode, ALL_FIELDS)
+        self.predicted = predicted or {}
+        self.analyze_kwargs = analyze_kwargs
+        self.ready = {}
+        self.used = None
+        self.future = None
+        self.lock = threading.Lock()
+
+    def publish(self, profile_url, section, value):
+        """on_section callback for the scraper"""
+        if profile_url != self.profile_url:
+            return
+        with self.lock:
+            self.ready[section] = value
+            if self.future is None:
+                self._maybe_start()
+
+    def _maybe_start(self):
+        inputs = {}
+        for field in self.fields:
+            if field in self.ready:
+                inputs[field] = self.ready[field]
+            elif field in self.predicted:
+                inputs[field] = self.predicted[field]
+            else:
+                return
+        # Main-page fields are only ever taken from this scrape
+        if 'name' not in self.ready:
+            return
+        inputs['url'] = self.profile_url
+        logger.info(f"Starting {self.mode} speculatively with {len(self.ready)} scraped sections")
+        self.used = inputs
+        self.future = _executor.submit(analyze_profile, dict(inputs), self.mode, **self.analyze_kwargs)
+
+    def finish(self, profile_data):
+        """Return the analysis for the final profile data"""
+        with self.lock:
+            future, used = self.future, self.used
+        if future is not None:
+            if all(used.get(f) == profile_data.get(f) for f in self.fields):
+                logger.info(f"Speculative {self.mode} kept")
+                result = future.result()
+                if result and not result.get('error'):
+                    return result
+            else:
+                stale = [f for f in self.fields if used.get(f) != profile_data.get(f)]
+                logger.info(f"Speculative {self.mode} discarded, changed: {', '.join(stale)}")
+                future.cancel()
+        return analyze_profile(profile_data, self.mode, **self.analyze_kwargs)
+
+    def cancel(self):
+        with self.lock:
+            if self.future is not None:
+                self.future.cancel()
@@ -0,0 +1,147 @@
+"""Keeps persistent browser profiles (playwright_user_data*) small.
+
+Chromium's HTTP cache, code cache and service-worker storage grow without
+limit and slow down launch_persistent_context. The disk cache is capped
+with --disk-cache-size (see BROWSER_ARGS). maintain_profile() runs before
+each launch and prunes the cache directories once they exceed
+PROFILE_CACHE_PRUNE_MB. Cookies, local storage and linkedin_cookies.json
+are left alone, so the login survives. Every browser holds its profile's
+lock (see lock_profile) while it runs, and a profile is only pruned, or
+benchmarked, by whoever holds that lock.
+
+Run as a script to report profile sizes and the effect of pruning on cold
+launch time:
+
+    python profile_maintenance.py --bench playwright_user_data
+"""
+import os, time, shutil, logging, argparse
+from pathlib import Path
+from config import PROFILE_CACHE_PRUNE_MB
+from file_lock import try_lock_file
+
+logger = logging.getLogger(__name__)
+
+# Relative to the profile directory; only caches Chromium rebuilds on demand
+CACHE_DIRS = [
+    "Default/Cache",
+    "Default/Code Cache",
+    "Default/GPUCache",
+    "Default/DawnCache",
+    "Default/DawnGraphiteCache",
+    "Default/DawnWebGPUCache",
+    "Default/Service Worker/CacheStorage",
+    "Default/Service Worker/ScriptCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "component_crx_cache",
+]
+
+def profile_lock_path(user_data_dir):
+    """playwright_user_data_3 -> playwright_user_data_3.lock, beside the profile
+    since clear_browser_data() wipes the profile dir"""
+    return Path(f"{Path(user_data_dir)}.lock")
+
+def lock_profile(user_data_dir):
+    """Open handle holding the profile's lock, or None if another browser holds it.
+    The lock is released when the handle is closed."""
+    handle = open(profile_lock_path(user_data_dir), "w")
+    if not try_lock_file(handle):
+        handle.close()
+        return None
+    return handle
+
+def dir_size(path):
+    """Bytes used by the files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+def _mb(size):
+    return round(size / (1024 * 1024), 1)
+
+def profile_size(user_data_dir):
+    """{'profile_mb', 'cache_mb'} of a browser profile directory"""
+    user_data_dir = Path(user_data_dir)
+    cache = sum(dir_size(user_data_dir / d) for d in CACHE_DIRS)
+    return {'profile_mb': _mb(dir_size(user_data_dir)), 'cache_mb': _mb(cache)}
+
+def prune_caches(user_data_dir):
+    """Delete the cache directories of a profile; returns the MB freed"""
+    freed = 0
+    for relative in CACHE_DIRS:
+        path = Path(user_data_dir) / relative
+        if not path.is_dir():
+            continue
+        size = dir_size(path)
+        shutil.rmtree(path, ignore_errors=True)
+        freed += size - dir_size(path)
+    return _mb(freed)
+
+def maintain_profile(user_data_dir, limit_mb=PROFILE_CACHE_PRUNE_MB, locked=True):
+    """Prune a profile's caches if they exceed limit_mb; returns size stats.
+
+    Pass locked=False when the caller could not take the profile's lock:
+    sizes are still reported but nothing is deleted.
+    """
+    try:
+        stats = profile_size(user_data_dir)
+        stats['pruned_mb'] = 0
+        if not locked:
+            logger.info(f"Not pruning {user_data_dir}, another browser holds its lock")
+        elif limit_mb and stats['cache_mb'] > limit_mb:
+            stats['pruned_mb'] = prune_caches(user_data_dir)
+            logger.info(f"Pruned {stats['pruned_mb']} MB of browser cache from {user_data_dir}")
+            stats.update(profile_size(user_data_dir))
+        return stats
+    except Exception as e:
+        logger.exception(f"Error maintaining browser profile {user_data_dir}: {e}")
+        return {'profile_mb': None, 'cache_mb': None, 'pruned_mb': 0}
+
+def measure_launch(user_data_dir, headless=True):
+    """Seconds for a cold launch_persistent_context on the profile"""
+    from playwright.sync_api import sync_playwright
+    from linkedin_login import BROWSER_ARGS
+    with sync_playwright() as playwright:
+        start = time.perf_counter()
+        context = playwright.chromium.launch_persistent_context(
+            user_data_dir=str(user_data_dir), headless=headless, args=BROWSER_ARGS)
+        seconds = time.perf_counter() - start
+        context.close()
+    return round(seconds, 3)
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and prune browser profile caches")
+    parser.add_argument("dirs", nargs="*", help="Profile directories (default: every playwright_user_data*)")
+    parser.add_argument("--prune", action="store_true", help="Prune caches regardless of size")
+    parser.add_argument("--bench", action="store_true",
+                        help="Measure cold launch time before and after pruning (implies --prune)")
+    args = parser.parse_args()
+
+    dirs = args.dirs or sorted(str(p) for p in Path(".").glob("playwright_user_data*") if p.is_dir())
+    for user_data_dir in dirs:
+        before = profile_size(user_data_dir)
+        line = f"{user_data_dir}: {before['profile_mb']} MB, {before['cache_mb']} MB cache"
+        if args.prune or args.bench:
+            lock = lock_profile(user_data_dir)
+            if lock is None:
+                print(f"{line} -> in use by a browser, skipped")
+                continue
+            try:
+                if args.bench:
+                    line += f", launch {measure_launch(user_data_dir):.2f}s"
+                freed = prune_caches(user_data_dir)
+                line += f" -> pruned {freed} MB, now {profile_size(user_data_dir)['profile_mb']} MB"
+                if args.bench:
+                    line += f", launch {measure_launch(user_data_dir):.2f}s"
+            finally:
+                lock.close()
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Selectors and text clean-up shared by the live scraper (scraper.py) and the
+offline snapshot parser (snapshot_parser.py), so both paths read the same
+elements and produce the same profile fields."""
+
+SECTION_HEADERS = {
+    'about': 'About',
+    'experience': 'Experience',
+    'education': 'Education',
+    'certifications': 'Licenses & certifications',
+    'skills': 'Skills',
+}
+
+# Details pages, relative to the profile URL
+DETAIL_PAGES = {
+    'experience': '/details/experience/',
+    'skills': '/details/skills',
+    'certifications': '/details/certifications',
+}
+
+NAME = "//h1"
+HEADLINE = "//h1/ancestor::div[1]/following-sibling::div[contains(@class,'text-body-medium')]"
+
+ABOUT_SHOW_MORE = "//div[contains(@class, 'display-flex ph5 pv3')]//button"
+ABOUT = [
+    "//div[contains(@class, 'display-flex ph5 pv3')]//span[@aria-hidden='true']",
+    "//section[contains(@class, 'pv-about-section')]//span",
+    "//div[contains(@class, 'pv-shared-text')]//span",
+    "//div[contains(@id, 'about')]//span",
+]
+
+LIST_ITEM = "//li[contains(@class,'artdeco-list__item')]"
+CERTIFICATION_ITEM = "//section[contains(@class,'artdeco-card')]//li[contains(@class,'artdeco-list__item')]"
+DETAIL_ITEMS = {
+    'experience': LIST_ITEM,
+    'skills': LIST_ITEM,
+    'certifications': CERTIFICATION_ITEM,
+}
+
+# Education is listed on the main page, in the block after its header's card
+EDUCATION_CONTAINER = "./ancestor::div[4]"
+EDUCATION_LIST = "./following-sibling::div"
+EDUCATION_ITEM = ".//li[contains(@class,'artdeco-list__item')]"
+
+# Relative to a list item: the bold first line (title, school, skill, certificate)
+ENTRY_TITLE = ".//div[contains(@class, 't-bold')]//span[@aria-hidden='true']"
+# Relative to ENTRY_TITLE: the line below it (degree, issuer) and the one below that (year, date)
+ENTRY_SUBTITLE = "./ancestor::div[4]/following-sibling::span//span[@aria-hidden='true']"
+ENTRY_CAPTION = "./ancestor::span/following-sibling::span//span[@aria-hidden='true']"
+ENTRY_LINKS = ".//a"
+
+EXPERIENCE_COMPANY = ".//span[contains(@class,'t-normal')]//span[@aria-hidden='true']"
+EXPERIENCE_DURATION = ".//span[contains(@class,'t-normal')]//span[contains(@class,'pvs-entity') and @aria-hidden='true']"
+
+# Returned when a main page field is missing
+NOT_FOUND = {
+    'name': "Name not found",
+    'headline': "Headline not found",
+    'about': "About section not found",
+}
+
+def section_header(section):
+    return f"//h2[.//span[text()='{SECTION_HEADERS[section]}']]"
+
+def company_name(text):
+    """'Acme · Full-time' -> 'Acme'"""
+    return text.split('·')[0].strip()
+
+def duration(text):
+    """'Jan 2020 - Present · 4 yrs' -> '4 yrs'"""
+    return text.split('·')[-1].strip()
+
+def split_degree(text):
+    """(degree, field) from an education line such as "Master's degree - MS, Computer Science" """
+    if not text:
+        return "", ""
+    parts = text.split("-", 1)
+    degree = parts[0].strip()
+    field = ""
+    if len(parts) > 1:
+        field_parts = parts[1].split(",", 1)
+        field = field_parts[1].strip() if len(field_parts) > 1 else field_parts[0].strip()
+    return degree, field
@@ -0,0 +1,112 @@
+import os, logging, hashlib, tempfile
+from datetime import datetime
+from pathlib import Path
+from config import PROFILE_STORE_DIR, PROFILE_CACHE_MAX_AGE
+from models import dumps, loads, normalize_profile
+from profile_urls import profile_key
+
+logger = logging.getLogger(__name__)
+
+# Sections that live on /details/ pages and are worth skipping when unchanged
+DETAIL_SECTIONS = ('experience', 'skills', 'certifications')
+
+def section_hash(value):
+    """Stable content hash of a single profile section"""
+    return hashlib.sha256(dumps(value, sort_keys=True)).hexdigest()[:16]
+
+def section_hashes(profile_data):
+    return {k: section_hash(v) for k, v in profile_data.items() if k != 'url'}
+
+def record_version(record):
+    """Short hash of a stored record's content; indexes compare it to skip
+    records they already hold"""
+    return section_hash(record.get('section_hashes') or record.get('profile', {}))
+
+def store_key(profile_url):
+    return hashlib.sha1(profile_key(profile_url).encode('utf-8')).hexdigest()
+
+def record_age(record):
+    """Seconds since the record was scraped (infinite if unknown)"""
+    try:
+        return (datetime.now() - datetime.fromisoformat(record['scraped_at'])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return float('inf')
+
+class ProfileStore:
+    """Stores scraped profiles on disk, one JSON record per profile"""
+
+    def __init__(self, root=PROFILE_STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        return self.root / f"{key}.json"
+
+    def get(self, profile_url):
+        path = self._path(store_key(profile_url))
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return loads(f.read())
+        except Exception as e:
+            logger.exception(f"Could not read stored profile {path}: {e}")
+            return None
+
+    def get_fresh(self, profile_url, fields=(), max_age=PROFILE_CACHE_MAX_AGE):
+        """The stored profile if it is younger than max_age and has all fields, else None"""
+        record = self.get(profile_url)
+        if not record or record_age(record) > max_age:
+            return None
+        profile = record.get('profile', {})
+        if any(field not in profile for field in fields):
+            return None
+        return profile
+
+    def put(self, profile_url, profile_data, fingerprints=None, stats=None):
+        profile_data = normalize_profile(profile_data)
+        record = {
+            'profile': profile_data,
+            'fingerprints': fingerprints or {},
+            'section_hashes': section_hashes(profile_data),
+            'scrape_stats': stats or {},
+            'scraped_at': datetime.now().isoformat(timespec='seconds')
+        }
+        path = self._path(store_key(profile_url))
+        tmp_path = None
+        try:
+            # A temp file per write: serving workers may store the same profile at once
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".{path.stem}-", suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dumps(record))
+            os.replace(tmp_path, path)
+            return record
+        except Exception as e:
+            logger.exception(f"Could not store profile {profile_url}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def iter_records(self, since=0.0):
+        """Yield (key, mtime, record) for records written at or after `since`.
+
+        Records written exactly at `since` are yielded again on the next call;
+        callers skip those they already hold (see record_version).
+        """
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                mtime = entry.stat().st_mtime
+                if mtime < since:
+                    continue
+                try:
+                    with open(entry.path, 'rb') as f:
+                        yield entry.name[:-5], mtime, loads(f.read())
+                except Exception as e:
+                    logger.warning(f"Skipping unreadable stored profile {entry.name}: {e}")
+
+    def changed_sections(self, record, profile_data):
+        """Sections whose content hash differs from the stored record"""
+        old_hashes = (record or {}).get('section_hashes', {})
+        return [k for k, h in section_hashes(profile_data).items() if old_hashes.get(k) != h]
@@ -0,0 +1,32 @@
+import re
+from urllib.parse import urlsplit, unquote
+
+PROFILE_PATH = re.compile(r'^/in/([^/]+)')
+
+def canonicalize_profile_url(url):
+    """Stable form of a LinkedIn profile URL: https://www.linkedin.com/in/<slug>
+
+    Accepts country subdomains, missing schemes, trailing slashes, query
+    strings and sub-pages such as /details/. Raises ValueError for anything
+    that is not a profile URL.
+    """
+    url = (url or '').strip()
+    if not url:
+        raise ValueError("Empty profile URL")
+    if '://' not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    if host != 'linkedin.com' and not host.endswith('.linkedin.com'):
+        raise ValueError(f"Not a LinkedIn URL: {url}")
+    match = PROFILE_PATH.match(parts.path)
+    if not match:
+        raise ValueError(f"Not a LinkedIn profile URL: {url}")
+    slug = unquote(match.group(1)).strip().lower()
+    if not slug:
+        raise ValueError(f"Not a LinkedIn profile URL: {url}")
+    return f"https://www.linkedin.com/in/{slug}"
+
+def profile_key(url):
+    """Key identifying a profile regardless of how its URL was written"""
+    return canonicalize_profile_url(url).rsplit('/', 1)[1]
@@ -0,0 +1,53 @@
+import os, re, time, logging, hashlib, tempfile
+from pathlib import Path
+from config import RESULT_STORE_DIR
+from models import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+RESULT_ID_PATTERN = re.compile(r'^[0-9a-f]{16}$')
+
+class ResultStore:
+    """Analysis results stored under the hash of their content.
+
+    The id doubles as a strong ETag: a given id always maps to the same
+    bytes, so results can be cached anywhere once they are written.
+    """
+
+    def __init__(self, root=RESULT_STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, profile_data, user_data, analysis_result):
+        content = {
+            'profile_data': profile_data,
+            'user_data': user_data,
+            'analysis_result': analysis_result,
+        }
+        result_id = hashlib.sha256(dumps(content, sort_keys=True)).hexdigest()[:16]
+        path = self.root / f"{result_id}.json"
+        if not path.exists():
+            record = dict(content, created_at=time.time())
+            # A temp file per write: serving workers may store the same result at once
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".{result_id}-", suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(dumps(record))
+                os.replace(tmp_path, path)
+            except Exception:
+                os.remove(tmp_path)
+                raise
+        return result_id
+
+    def get(self, result_id):
+        if not RESULT_ID_PATTERN.match(result_id or ''):
+            return None
+        path = self.root / f"{result_id}.json"
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return loads(f.read())
+        except Exception as e:
+            logger.exception(f"Could not read result {result_id}: {e}")
+            return None
@@ -1,18 +1,132 @@
-import logging
-from dotenv import load_dotenv
-from linkedin_login import LinkedInLogin
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(name)s - %(levelname)s - %(message)s'
-    )
+import logging, time, threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from linkedin_login import LinkedInLogin, claim_profile_slot
+from profile_store import DETAIL_SECTIONS
+from config import SECTION_LIMITS, HTML_SNAPSHOT
+from selector_race import selector_race
+from memory_governor import MemoryGovernor
+import profile_selectors as sel
+from profile_selectors import SECTION_HEADERS, DETAIL_PAGES
+import snapshot_parser
+
 logger = logging.getLogger(__name__)
-load_dotenv()
+
+# Fields available without leaving the main profile page
+MAIN_PAGE_FIELDS = ('name', 'headline', 'about', 'education')
+
+def resolve_detail_sections(fields=None):
+    """Detail pages to visit for a field set.
+
+    `fields` is "full" (or None), "main", or an iterable of field names such
+    as ("skills",) for main page plus the skills details page.
+    """
+    if fields is None or fields == 'full':
+        return set(DETAIL_SECTIONS)
+    if fields == 'main':
+        return set()
+    if isinstance(fields, str):
+        fields = [fields]
+    unknown = set(fields) - set(DETAIL_SECTIONS) - set(MAIN_PAGE_FIELDS) - {'url'}
+    if unknown:
+        raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+    return set(fields) & set(DETAIL_SECTIONS)
+
+LOAD_MORE_SELECTOR = "button.scaffold-finite-scroll__load-button"
+
+ITEM_COUNT_SCRIPT = """([xpath, before]) => document.evaluate(
+    xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+).snapshotLength > before"""
+
+FINGERPRINT_SCRIPT = """(headers) => {
+    const result = {};
+    for (const [key, title] of Object.entries(headers)) {
+        const header = Array.from(document.querySelectorAll('h2 span'))
+            .find(span => span.textContent.trim() === title);
+        if (!header) { result[key] = null; continue; }
+        const section = header.closest('section');
+        const items = section ? section.querySelectorAll('li.artdeco-list__item') : [];
+        const first = items.length ? items[0].innerText : (section ? section.innerText : '');
+        result[key] = {count: items.length, first: first.trim().replace(/\\s+/g, ' ').slice(0, 200)};
+    }
+    return result;
+}"""
+
+# Scrolls only until the wanted section headers have rendered. A MutationObserver
+# ends each step's wait as soon as the page changes, and an IntersectionObserver on
+# a sentinel after the main content notices when the end of the page is reached.
+SCROLL_TO_SECTIONS_SCRIPT = """async ({titles, step, maxSteps, settleMs}) => {
+    const present = () => new Set(Array.from(document.querySelectorAll('h2 span'))
+        .map(span => span.textContent.trim()));
+    const missing = () => { const seen = present(); return titles.filter(t => !seen.has(t)); };
+    if (!missing().length) return {steps: 0, missing: [], complete: true};
+
+    const root = document.querySelector('main') || document.body;
+    const sentinel = document.createElement('div');
+    root.appendChild(sentinel);
+    let atEnd = false;
+    const io = new IntersectionObserver(entries => { atEnd = entries.some(e => e.isIntersecting); });
+    io.observe(sentinel);
+    let wake = null;
+    let changed = false;
+    const mo = new MutationObserver(() => { changed = true; if (wake) wake(); });
+    mo.observe(root, {childList: true, subtree: true});
+    const settle = () => new Promise(resolve => {
+        wake = resolve;
+        setTimeout(resolve, settleMs);
+    });
+
+    let steps = 0;
+    try {
+        while (steps < maxSteps && missing().length) {
+            changed = false;
+            window.scrollBy(0, step);
+            steps++;
+            await settle();
+            // Nothing left to reveal: the sentinel is visible and the page stopped growing
+            if (atEnd && !changed) break;
+        }
+    } finally {
+        io.disconnect();
+        mo.disconnect();
+        sentinel.remove();
+        window.scrollTo(0, 0);
+    }
+    const left = missing();
+    return {steps, missing: left, complete: !left.length || atEnd};
+}"""
+
+def _then(future, fn):
+    """Future of fn(result) once `future` resolves"""
+    chained = Future()
+    def done(source):
+        try:
+            chained.set_result(fn(source.result()))
+        except Exception as e:
+            chained.set_exception(e)
+    future.add_done_callback(done)
+    return chained
+
+def _first_text(locator):
+    """Text of the first match, or "" without waiting out a timeout when
+    there is none (as snapshot_parser does)"""
+    first = locator.first
+    return first.inner_text().strip() if first.count() else ""
 
 class LinkedInScraper:
 
-    def __init__(self, headless):
-        self.auth = LinkedInLogin(headless)
+    def __init__(self, headless, limits=None, user_data_dir=None, profile_lock=None):
+        """`limits` overrides SECTION_LIMITS per section; a limit of None
+        means "full" and pages through the details list until exhausted.
+        `profile_lock` is passed on to LinkedInLogin."""
+        self.auth = LinkedInLogin(headless, user_data_dir=user_data_dir, profile_lock=profile_lock)
+        self.fingerprints = {}
+        self.limits = {**SECTION_LIMITS, **(limits or {})}
+        self.section_stats = {}
+        # Sections whose extraction hit an error this scrape (see _reusable)
+        self.failed_sections = set()
+        self.governor = MemoryGovernor()
+        self.memory_stats = {}
+        self.scroll_stats = {}
 
     @property
     def page(self):
@@ -21,104 +135,342 @@ class LinkedInScraper:
     def random_delay(self, min_sec=1, max_sec=3):
         self.auth.random_delay(min_sec, max_sec)
 
-    def scrape_profile(self, profile_url, max_login_retries=3):
-        """Scrape LinkedIn profile data with account rotation only when needed"""
+    def scrape_profile(self, profile_url, max_login_retries=3, previous=None, fields=None, on_section=None,
+                       wait=True):
+        """Scrape LinkedIn profile data with account rotation only when needed.
+
+        When a previously stored record is given, detail pages are only
+        visited for sections whose main-page fingerprint has changed.
+        `fields` limits which detail pages are visited (see resolve_detail_sections);
+        sections that are not requested are left out of the result.
+        `on_section(section, value)` is called as each section completes.
+        In snapshot mode pages may still be parsing once the browser is done;
+        with wait=False a Future of the profile data is returned instead, so
+        the browser can move on to the next profile.
+        """
         self.profile_url = profile_url
+        detail_sections = resolve_detail_sections(fields)
         
         if not self.auth.ensure_logged_in(profile_url, max_login_retries):
             return None
             
         logger.info("Starting profile scraping...")
-        # Scroll to load all sections
-        try:
-            logger.info("Scrolling page to load all sections...")
-            for i in range(3):
-                self.page.evaluate("window.scrollBy(0, 800)")
-                self.random_delay(0.5, 1)
-            self.page.evaluate("window.scrollTo(0, 0)")
-            self.random_delay(1, 2)
-        except Exception as scroll_error:
-            logger.exception(f"Error scrolling page: {scroll_error}")
+        self.scroll_stats = self._scroll_to_sections(['about', 'education', *sorted(detail_sections)])
 
         try:
-            profile_data = {
-                'name': self._extract_name(),
-                'headline': self._extract_headline(),
-                'about': self._extract_about(),
-                'education': self._extract_education(),
-                'certifications': self._extract_certificate(),
-                'experience': self._extract_experience(),
-                'skills': self._extract_skills(),
-                'url': profile_url
+            self.fingerprints = self._extract_fingerprints()
+            unchanged = self._unchanged_sections(previous)
+            self.section_stats = {}
+            self.failed_sections = set()
+
+            main_extractors = {
+                'name': self._extract_name,
+                'headline': self._extract_headline,
+                'about': self._extract_about,
+                'education': self._extract_education,
             }
-            logger.info("Profile scraping completed successfully")
-            return profile_data
+            snapshot = HTML_SNAPSHOT and snapshot_parser.available()
+            snapshot_main, snapshot_details = [], []
+            profile_data = {}
+            for section, extract in main_extractors.items():
+                if snapshot:
+                    snapshot_main.append(section)
+                    continue
+                else:
+                    profile_data[section] = self._timed(section, extract)
+                self._publish(on_section, section, profile_data[section])
+
+            extractors = {
+                'certifications': self._extract_certificate,
+                'experience': self._extract_experience,
+                'skills': self._extract_skills,
+            }
+            for section, extract in extractors.items():
+                if section not in detail_sections:
+                    continue
+                if section in unchanged:
+                    logger.info(f"{section.capitalize()} unchanged since last scrape, skipping details page")
+                    profile_data[section] = previous['profile'][section]
+                    self.section_stats[section] = dict(previous['scrape_stats']['sections'][section],
+                                                       seconds=0.0, source='stored')
+                elif snapshot:
+                    snapshot_details.append(section)
+                    continue
+                else:
+                    profile_data[section] = self._timed(section, extract)
+                self._publish(on_section, section, profile_data[section])
+
+            parsing = None
+            if snapshot_main or snapshot_details:
+                parsing = self._snapshot_sections(snapshot_main, snapshot_details, on_section)
+            profile_data['url'] = profile_url
+            self.memory_stats = self.governor.after_scrape(self.auth)
+
+            # Snapshot sections finish after the next scrape may have replaced self.section_stats
+            section_stats = self.section_stats
+            order = [*main_extractors, *extractors, 'url']
+
+            def finish(parsed):
+                # Same field order as the live path
+                done = {**profile_data, **parsed}
+                logger.info("Profile scraping completed successfully")
+                logger.info("Section stats: " + ", ".join(
+                    f"{k}={v['items']} items/{v['seconds']:.2f}s" for k, v in section_stats.items()))
+                return {section: done[section] for section in order if section in done}
+
+            if parsing is None:
+                return finish({})
+            result = _then(parsing, finish)
+            return result.result() if wait else result
 
         except Exception as e:
             logger.exception(f"Error scraping profile: {e}")
             return None
     
+    def _scroll_to_sections(self, sections, step=800, max_steps=15, settle_ms=600):
+        """Scroll until the headers of `sections` have rendered or the page ends"""
+        titles = [SECTION_HEADERS[section] for section in sections]
+        start = time.perf_counter()
+        try:
+            stats = self.page.evaluate(SCROLL_TO_SECTIONS_SCRIPT, {
+                'titles': titles, 'step': step, 'maxSteps': max_steps, 'settleMs': settle_ms})
+        except Exception as e:
+            logger.exception(f"Error scrolling page: {e}")
+            return {}
+        stats['seconds'] = round(time.perf_counter() - start, 3)
+        logger.info(f"Scrolled {stats['steps']} steps in {stats['seconds']:.2f}s"
+                    + (f", missing: {', '.join(stats['missing'])}" if stats['missing'] else ""))
+        return stats
+
+    def _section_absent(self, section):
+        """True when scrolling reached the end of the page without this section"""
+        return bool(self.scroll_stats.get('complete')) and SECTION_HEADERS[section] in self.scroll_stats.get('missing', ())
+
+    def _publish(self, on_section, section, value):
+        if not on_section:
+            return
+        try:
+            on_section(section, value)
+        except Exception as e:
+            logger.exception(f"Section callback error for {section}: {e}")
+
+    def _timed(self, section, extract):
+        """Run an extractor and record its item count and wall time"""
+        start = time.perf_counter()
+        value = extract()
+        self.section_stats[section] = {
+            'items': len(value) if isinstance(value, list) else int(bool(value)),
+            'seconds': round(time.perf_counter() - start, 3),
+            'ok': section not in self.failed_sections,
+            'limit': self.limits.get(section),
+        }
+        return value
+
+    def _iter_list_items(self, xpath, section, paginate=True):
+        """Yield list items one at a time, stopping as soon as the section limit
+        is reached. On details pages more items are loaded (load-more button or
+        scrolling) when the rendered ones run out and the page has more."""
+        limit = self.limits.get(section)
+        items = self.page.locator(f"xpath={xpath}")
+        available = items.count()
+        index = 0
+        while limit is None or index < limit:
+            if index >= available:
+                if not paginate or not self._load_more_items(xpath, available, limit):
+                    break
+                available = items.count()
+            yield items.nth(index)
+            index += 1
+
+    def _load_more_items(self, xpath, before, limit):
+        """Load the next batch of list items; False when there is none.
+
+        With a limit, only a visible load-more button counts as "more": a
+        short list would otherwise wait out the timeout on every scrape.
+        Scrolling for lazily loaded items is reserved for "full" (None).
+        """
+        try:
+            load_more = self.page.locator(LOAD_MORE_SELECTOR)
+            if load_more.count() and load_more.first.is_visible():
+                load_more.first.click()
+            elif limit is None:
+                self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            else:
+                return False
+            self.page.wait_for_function(ITEM_COUNT_SCRIPT, arg=[xpath, before], timeout=3000)
+            return True
+        except Exception:
+            return False
+
+    def _snapshot_sections(self, main_sections, detail_sections, on_section=None):
+        """Extract sections from HTML snapshots parsed in the snapshot pool.
+
+        Each page is captured once with page.content() and the browser moves
+        straight on to the next details page while earlier pages are parsed.
+        Sections are published as soon as their page is parsed, so main-page
+        fields reach on_section while details pages are still loading.
+        Returns a Future of {section: value}, resolved once every page is parsed.
+        """
+        pool = snapshot_parser.parse_pool()
+        section_stats = self.section_stats
+        values = {}
+        lock = threading.Lock()
+        # Pages being parsed, plus one until every page has been captured
+        remaining = [1]
+        result = Future()
+
+        def page_done():
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            for section in [*main_sections, *detail_sections]:
+                if section not in values:
+                    values[section] = sel.NOT_FOUND.get(section, [])
+                    section_stats[section] = {'items': 0, 'seconds': 0.0, 'source': 'snapshot', 'ok': False}
+                    self._publish(on_section, section, values[section])
+            result.set_result(values)
+
+        def parsed(future):
+            try:
+                sections = future.result()
+            except Exception as e:
+                logger.exception(f"Snapshot parsing error: {e}")
+                sections = {}
+            for section, (value, seconds, *selector) in sections.items():
+                if selector and selector[0]:
+                    selector_race.record_hit("about", selector[0])
+                values[section] = value
+                section_stats[section] = {
+                    'items': len(value) if isinstance(value, list) else int(bool(value)),
+                    'seconds': seconds,
+                    'source': 'snapshot',
+                    'ok': True,
+                    'limit': self.limits.get(section),
+                }
+                self._publish(on_section, section, value)
+            page_done()
+
+        def submit(*args):
+            future = pool.submit(snapshot_parser.parse_snapshot, *args)
+            with lock:
+                remaining[0] += 1
+            future.add_done_callback(parsed)
+
+        # Header checks need the main page, so they happen before navigating away
+        present = [s for s in detail_sections if not self._section_absent(s)
+                   and self.page.locator(sel.section_header(s)).count()]
+        if main_sections:
+            about_selectors = selector_race.ordered("about", sel.ABOUT)
+            submit('main', self.page.content(), main_sections, self.limits, about_selectors)
+        for section in present:
+            html = self._capture_details(section)
+            if html is not None:
+                submit(section, html, [section], self.limits)
+        page_done()
+        return result
+
+    def _capture_details(self, section):
+        """HTML of a details page once enough items for the section limit have loaded"""
+        item_xpath = sel.DETAIL_ITEMS[section]
+        try:
+            self.page.goto(f"{self.profile_url}{DETAIL_PAGES[section]}", timeout=30000)
+            self.random_delay(2, 3)
+            self.page.wait_for_selector(item_xpath, timeout=10000)
+            limit = self.limits.get(section)
+            items = self.page.locator(f"xpath={item_xpath}")
+            count = items.count()
+            while (limit is None or count < limit) and self._load_more_items(item_xpath, count, limit):
+                count = items.count()
+            return self.page.content()
+        except Exception as e:
+            logger.warning(f"Could not capture {section} details page: {e}")
+            return None
+
+    def _extract_fingerprints(self):
+        """Cheap per-section fingerprints (item count, first entry) from the main page"""
+        try:
+            return self.page.evaluate(FINGERPRINT_SCRIPT, SECTION_HEADERS) or {}
+        except Exception as e:
+            logger.exception(f"Fingerprint extraction error: {e}")
+            return {}
+
+    def _unchanged_sections(self, previous):
+        """Detail sections whose fingerprint matches the stored record and
+        whose stored copy can be reused"""
+        if not previous or not self.fingerprints:
+            return set()
+        old_fingerprints = previous.get('fingerprints', {})
+        return {
+            section for section in DETAIL_SECTIONS
+            if self.fingerprints.get(section) is not None
+            and self.fingerprints.get(section) == old_fingerprints.get(section)
+            and self._reusable(section, previous)
+        }
+
+    def _reusable(self, section, previous):
+        """A stored section is only reused when it was extracted without errors,
+        under the current limit, and holds at least the items the main page shows"""
+        value = previous.get('profile', {}).get(section)
+        stats = previous.get('scrape_stats', {}).get('sections', {}).get(section, {})
+        if not value or not stats.get('ok') or 'limit' not in stats:
+            return False
+        limit = self.limits.get(section)
+        if stats['limit'] != limit:
+            return False
+        shown = self.fingerprints[section].get('count', 0)
+        return len(value) >= (shown if limit is None else min(shown, limit))
+
     def _extract_name(self):
         try:
-            self.page.wait_for_selector("//h1", timeout= 10 * 1000)
-            element = self.page.query_selector("//h1")
-            return element.inner_text().strip() if element else "Name not found"
+            self.page.wait_for_selector(sel.NAME, timeout= 10 * 1000)
+            element = self.page.query_selector(sel.NAME)
+            return element.inner_text().strip() if element else sel.NOT_FOUND['name']
         except Exception as e:
             logger.exception(f"Name extraction error: {e}")
-            return "Name not found"
+            return sel.NOT_FOUND['name']
         
     def _extract_headline(self):
         try:
-            element = self.page.query_selector("//h1/ancestor::div[1]/following-sibling::div[contains(@class,'text-body-medium')]")
-            return element.inner_text().strip() if element else "Headline not found"
+            element = self.page.query_selector(sel.HEADLINE)
+            return element.inner_text().strip() if element else sel.NOT_FOUND['headline']
         except Exception as e:
             logger.exception(f"Headline extraction error: {e}")
-            return "Headline not found"
+            return sel.NOT_FOUND['headline']
     
     def _extract_about(self):
         try:
-            about_header = self.page.query_selector("//h2[.//span[text()='About']]")
+            about_header = self.page.query_selector(sel.section_header('about'))
             if about_header:
                 try:
-                    show_more = self.page.query_selector("//div[contains(@class, 'display-flex ph5 pv3')]//button")
+                    show_more = self.page.query_selector(sel.ABOUT_SHOW_MORE)
                     if show_more:
                         show_more.click()
                         self.random_delay(1, 2)
                 except:
                     pass
 
-                selectors = [
-                    "//div[contains(@class, 'display-flex ph5 pv3')]//span[@aria-hidden='true']",
-                    "//section[contains(@class, 'pv-about-section')]//span",
-                    "//div[contains(@class, 'pv-shared-text')]//span",
-                    "//div[contains(@id, 'about')]//span"
-                ]
-
-                for selector in selectors:
-                    element = self.page.query_selector(selector)
-                    if element:
-                        text = element.inner_text().strip()
-                        if text:
-                            logger.info("About section extracted successfully")
-                            return text
-            return "About section not found"
+                selector, element = selector_race.resolve(
+                    self.page, "about", sel.ABOUT,
+                    accept=lambda el: bool(el.inner_text().strip())
+                )
+                if element:
+                    logger.info("About section extracted successfully")
+                    return element.inner_text().strip()
+            return sel.NOT_FOUND['about']
         except Exception as e:
             logger.exception(f"About section extraction error: {e}")
 
     def _extract_experience(self):
         try:
             experience_list = []
+            if self._section_absent('experience'):
+                logger.info("No Experience section found on profile")
+                return []
 
-            try:
-                logger.info("Scrolling to Experience section...")
-                self.page.evaluate("window.scrollBy(0, 500)")
-                self.random_delay(1, 2)
-            except:
-                pass
-            
             try:
                 experience_header = self.page.wait_for_selector(
-                    "//h2[.//span[text()='Experience']]", 
+                    sel.section_header('experience'),
                     timeout=5000
                 )
                 if not experience_header:
@@ -126,25 +478,20 @@ class LinkedInScraper:
                     return []
             except Exception as timeout_error:
                 logger.warning(f"Experience section not found")
+                self.failed_sections.add('experience')
                 return []
         
             logger.info("Experience section found, navigating to details page...")
-            self.page.goto(f"{self.profile_url}/details/experience/", timeout=30000)
+            self.page.goto(f"{self.profile_url}{DETAIL_PAGES['experience']}", timeout=30000)
             self.random_delay(2, 3)
             
             try:
-                self.page.wait_for_selector("//li[contains(@class, 'artdeco-list__item')]", timeout=10000)
-                experience_items = self.page.locator("xpath=//li[contains(@class, 'artdeco-list__item')]").all()
-                
-                for item in experience_items[:5]:
+                self.page.wait_for_selector(sel.LIST_ITEM, timeout=10000)
+                for item in self._iter_list_items(sel.LIST_ITEM, 'experience'):
                     try:
-                        title_element = item.locator("xpath=.//div[contains(@class, 't-bold')]//span[@aria-hidden='true']").first
-                        company_element = item.locator("xpath=.//span[contains(@class,'t-normal')]//span[@aria-hidden='true']").first
-                        duration_element = item.locator("xpath=.//span[contains(@class,'t-normal')]//span[contains(@class,'pvs-entity') and @aria-hidden='true']").first
-
-                        title = title_element.inner_text().strip() if title_element else ""
-                        company = company_element.inner_text().strip().split('·')[0].strip() if company_element else ""
-                        duration = duration_element.inner_text().strip().split('·')[-1].strip() if duration_element else ""
+                        title = _first_text(item.locator(f"xpath={sel.ENTRY_TITLE}"))
+                        company = sel.company_name(_first_text(item.locator(f"xpath={sel.EXPERIENCE_COMPANY}")))
+                        duration = sel.duration(_first_text(item.locator(f"xpath={sel.EXPERIENCE_DURATION}")))
 
                         if title and company:
                             experience_list.append({
@@ -158,6 +505,7 @@ class LinkedInScraper:
                 logger.info(f"Extracted {len(experience_list)} experience entries")
             except Exception as extract_error:
                 logger.warning(f"Could not extract experience items")
+                self.failed_sections.add('experience')
             
             self.page.go_back()
             self.random_delay(1, 2)
@@ -165,6 +513,7 @@ class LinkedInScraper:
             
         except Exception as e:
             logger.exception(f"Experience extraction error: {e}")
+            self.failed_sections.add('experience')
             try:
                 self.page.go_back()
             except:
@@ -174,17 +523,13 @@ class LinkedInScraper:
     def _extract_skills(self):
         try:
             skills_list = []
-            
-            try:
-                logger.info("Scrolling to Skills section...")
-                self.page.evaluate("window.scrollBy(0, 1000)")
-                self.random_delay(1, 2)
-            except:
-                pass
-            
+            if self._section_absent('skills'):
+                logger.info("No Skills section found on profile")
+                return []
+
             try:
                 skills_header = self.page.wait_for_selector(
-                    "//h2[.//span[text()='Skills']]",
+                    sel.section_header('skills'),
                     timeout=5000
                 )
                 if not skills_header:
@@ -192,23 +537,20 @@ class LinkedInScraper:
                     return []
             except Exception as timeout_error:
                 logger.warning(f"Skills section not found")
+                self.failed_sections.add('skills')
                 return []
             
             logger.info("Skills section found, navigating to details page...")
-            self.page.goto(f"{self.profile_url}/details/skills", timeout=30000)
+            self.page.goto(f"{self.profile_url}{DETAIL_PAGES['skills']}", timeout=30000)
             self.random_delay(2, 3)
             
             try:
-                self.page.wait_for_selector("//li[contains(@class,'artdeco-list__item')]", timeout=10000)
-                skill_items = self.page.locator("xpath=//li[contains(@class,'artdeco-list__item')]").all()
-                
-                for item in skill_items[:15]:
+                self.page.wait_for_selector(sel.LIST_ITEM, timeout=10000)
+                for item in self._iter_list_items(sel.LIST_ITEM, 'skills'):
                     try:
-                        skill_element = item.locator("xpath=.//div[contains(@class, 't-bold')]//span[@aria-hidden='true']").first
-                        if skill_element:
-                            skill = skill_element.inner_text().strip()
-                            if skill:
-                                skills_list.append(skill)
+                        skill = _first_text(item.locator(f"xpath={sel.ENTRY_TITLE}"))
+                        if skill:
+                            skills_list.append(skill)
                     except:
                         continue
                 
@@ -216,6 +558,7 @@ class LinkedInScraper:
                 logger.info(f"Extracted {len(skills_list)} skills")
             except Exception as extract_error:
                 logger.warning(f"Could not extract skill items")
+                self.failed_sections.add('skills')
             
             self.page.go_back()
             self.random_delay(1, 2)
@@ -223,6 +566,7 @@ class LinkedInScraper:
             
         except Exception as e:
             logger.exception(f"Skills extraction error: {e}")
+            self.failed_sections.add('skills')
             try:
                 self.page.go_back()
             except:
@@ -232,53 +576,39 @@ class LinkedInScraper:
     def _extract_education(self):
         try:
             education_list = []
-            education_header = self.page.locator("//h2[.//span[text()='Education']]")
+            education_header = self.page.locator(sel.section_header('education'))
             if education_header.count() == 0:
                 return []
 
-            education_container = education_header.locator("xpath=./ancestor::div[4]").first
-            education_section = education_container.locator("xpath=./following-sibling::div").first
+            education_container = education_header.locator(f"xpath={sel.EDUCATION_CONTAINER}").first
+            education_section = education_container.locator(f"xpath={sel.EDUCATION_LIST}").first
             
-            main_page_education = education_section.locator("xpath=.//li[contains(@class,'artdeco-list__item')]").all()
+            main_page_education = education_section.locator(f"xpath={sel.EDUCATION_ITEM}")
+            limit = self.limits.get('education')
+            count = main_page_education.count()
             
-            for item in main_page_education[:5]:
+            for index in range(count if limit is None else min(count, limit)):
+                item = main_page_education.nth(index)
                 try:
                     # Extract school name
-                    school_element = item.locator("xpath=.//div[contains(@class, 't-bold')]//span[@aria-hidden='true']").first
-                    school = school_element.inner_text().strip() if school_element else ""
+                    school_element = item.locator(f"xpath={sel.ENTRY_TITLE}").first
+                    school = _first_text(school_element)
                     
                     # Extract degree and field
-                    degree_element = school_element.locator("xpath=./ancestor::div[4]/following-sibling::span//span[@aria-hidden='true']").first
-                    degree_text = degree_element.inner_text().strip() if degree_element else ""
+                    degree_element = school_element.locator(f"xpath={sel.ENTRY_SUBTITLE}").first
+                    degree_text = _first_text(degree_element)
                     
                     # Extract year/duration
-                    year_element = degree_element.locator("xpath=./ancestor::span/following-sibling::span//span[@aria-hidden='true']").first
-                    year = year_element.inner_text().strip() if year_element else ""
+                    year = _first_text(degree_element.locator(f"xpath={sel.ENTRY_CAPTION}"))
                     
-                    # ALTERNATIVE: Simple try-except approach
-                    degree = ""
-                    field = ""
-                    
-                    try:
-                        if degree_text:
-                            # Try to split by "-"
-                            parts = degree_text.split("-", 1)  # maxsplit=1
-                            degree = parts[0].strip()
-                            
-                            if len(parts) > 1:
-                                # Try to split by ","
-                                field_parts = parts[1].split(",", 1)  # maxsplit=1
-                                field = field_parts[1].strip() if len(field_parts) > 1 else field_parts[0].strip()
-                    except:
-                        # If parsing fails, just use the whole text as degree
-                        degree = degree_text
+                    degree, field = sel.split_degree(degree_text)
 
                     if school:
                         education_entry = {
                             'school': school,
-                            'degree': degree or 'Degree',
-                            'field': field or 'Field of Study',
-                            'year': year or 'Year'
+                            'degree': degree,
+                            'field': field,
+                            'year': year
                         }
                         education_list.append(education_entry)
                         
@@ -298,39 +628,36 @@ class LinkedInScraper:
     def _extract_certificate(self):
         try:
             certificate_list = []
-            certification_header = self.page.locator("//h2[.//span[text()='Licenses & certifications']]")
+            certification_header = self.page.locator(sel.section_header('certifications'))
             if certification_header.count() == 0:
                 return []
             
-            self.page.goto(f"{self.profile_url}/details/certifications")
+            self.page.goto(f"{self.profile_url}{DETAIL_PAGES['certifications']}")
             try:
-                self.page.wait_for_selector("//section[contains(@class,'artdeco-card')]//li[contains(@class,'artdeco-list__item')]", timeout=10000)
-                certificate_items = self.page.locator("xpath=//section[contains(@class,'artdeco-card')]//li[contains(@class,'artdeco-list__item')]").all()
-                
-                for item in certificate_items[:5]:
+                self.page.wait_for_selector(sel.CERTIFICATION_ITEM, timeout=10000)
+                for item in self._iter_list_items(sel.CERTIFICATION_ITEM, 'certifications'):
                     try:
                         # Extract certificate name
-                        certificate_element = item.locator("xpath=.//div[contains(@class, 't-bold')]//span[@aria-hidden='true']").first
-                        certificate = certificate_element.inner_text().strip() if certificate_element else ""
+                        certificate_element = item.locator(f"xpath={sel.ENTRY_TITLE}").first
+                        certificate = _first_text(certificate_element)
                         
-                        # Extract certificate link
-                        link_element = item.locator("xpath=.//a").nth(1)
-                        certificate_link = link_element.get_attribute("href") if link_element else ""
+                        # Extract certificate link (the second link; the first is the issuer logo)
+                        links = item.locator(f"xpath={sel.ENTRY_LINKS}")
+                        certificate_link = links.nth(1).get_attribute("href") if links.count() > 1 else ""
 
                         # Extract certificate issuer
-                        issuer_element = certificate_element.locator("xpath=ancestor::div[4]/following-sibling::span//span[@aria-hidden='true']").first
-                        issuer = issuer_element.inner_text().strip() if issuer_element else ""
+                        issuer_element = certificate_element.locator(f"xpath={sel.ENTRY_SUBTITLE}").first
+                        issuer = _first_text(issuer_element)
 
                         # Extract issued date
-                        date_element = issuer_element.locator("xpath=./ancestor::span/following-sibling::span//span[@aria-hidden='true']").first
-                        date = date_element.inner_text().strip() if date_element else ""
+                        date = _first_text(issuer_element.locator(f"xpath={sel.ENTRY_CAPTION}"))
 
                         if certificate:
                             certificate_entry = {
                                 'certificate': certificate,
-                                'link': certificate_link or 'Link to Certificate',
-                                'issuer': issuer or 'Issued By __',
-                                'date': date or 'Issued Date'
+                                'link': certificate_link or '',
+                                'issuer': issuer,
+                                'date': date
                             }
                             certificate_list.append(certificate_entry)
                     except Exception as item_error:
@@ -338,6 +665,7 @@ class LinkedInScraper:
             
             except Exception as wait_error:
                     logger.exception(f"Certificates content didn't load: {wait_error}")
+                    self.failed_sections.add('certifications')
 
             logger.info("Extracted Certificates section successfully") if certificate_list else logger.warning("Empty certificates section found")
             self.page.go_back()
@@ -345,19 +673,95 @@ class LinkedInScraper:
 
         except Exception as e:
             logger.exception(f"Certificate extraction error: {e}")
+            self.failed_sections.add('certifications')
             return []
     
     def close(self):
         self.auth.close()
 
-def scrape_linkedin_profile(profile_url, headless=True):
-    """Convenience function to scrape a LinkedIn profile"""
-    scraper = LinkedInScraper(headless=headless)
-    try:
-        profile_data = scraper.scrape_profile(profile_url)
+def _merge_skipped_sections(profile_data, fingerprints, section_stats, previous):
+    """Keep stored sections (and their old fingerprints and stats) that a partial scrape skipped"""
+    if not previous:
+        return profile_data, fingerprints, section_stats
+    merged_profile = dict(profile_data)
+    merged_fingerprints = dict(fingerprints)
+    merged_stats = dict(section_stats)
+    old_stats = previous.get('scrape_stats', {}).get('sections', {})
+    for section in DETAIL_SECTIONS:
+        if section not in profile_data and section in previous.get('profile', {}):
+            merged_profile[section] = previous['profile'][section]
+            merged_fingerprints[section] = previous.get('fingerprints', {}).get(section)
+            if section in old_stats:
+                merged_stats[section] = old_stats[section]
+    return merged_profile, merged_fingerprints, merged_stats
+
+def scrape_with(scraper, profile_url, store=None, fields=None, on_section=None, wait=True):
+    """Scrape with an already running scraper, refreshing the stored record if any.
+
+    `on_section(profile_url, section, value)` is called as each section completes.
+    With wait=False the result may be a Future (see LinkedInScraper.scrape_profile).
+    """
+    previous = store.get(profile_url) if store else None
+    publish = (lambda section, value: on_section(profile_url, section, value)) if on_section else None
+    result = scraper.scrape_profile(profile_url, previous=previous, fields=fields, on_section=publish, wait=wait)
+    # Taken now, before the scraper moves on to another profile
+    scraped_fingerprints, scraped_stats = scraper.fingerprints, scraper.section_stats
+    other_stats = {'memory': scraper.memory_stats, 'scroll': scraper.scroll_stats}
+
+    def store_result(profile_data):
+        if profile_data and store:
+            changed = store.changed_sections(previous, profile_data)
+            if previous:
+                logger.info(f"Refreshed profile, changed sections: {changed or 'none'}")
+            merged, fingerprints, section_stats = _merge_skipped_sections(
+                profile_data, scraped_fingerprints, scraped_stats, previous)
+            store.put(profile_url, merged, fingerprints, stats={'sections': section_stats, **other_stats})
         return profile_data
+
+    if isinstance(result, Future):
+        return _then(result, store_result)
+    return store_result(result)
+
+def scrape_linkedin_profile(profile_url, headless=True, store=None, fields=None, limits=None, on_section=None):
+    """Convenience function to scrape a LinkedIn profile.
+
+    With a ProfileStore the scrape becomes an incremental refresh of the
+    stored record, and the result is written back to the store.
+    """
+    scraper = LinkedInScraper(headless=headless, limits=limits)
+    try:
+        return scrape_with(scraper, profile_url, store=store, fields=fields, on_section=on_section)
     except Exception as e:
         logger.exception(f"Scrape error: {e}")
         return None
     finally:
-        scraper.close()
\ No newline at end of file
+        scraper.close()
+
+
+def scrape_linkedin_profiles(jobs, headless=True, store=None, on_section=None):
+    """Scrape several (profile_url, fields) jobs at once, each in its own browser.
+
+    The first job uses the default browser profile; the others claim their
+    own profile slots since a Chromium profile can only be opened once.
+    Returns results in job order (None for failed scrapes).
+    """
+    def run(index, profile_url, fields):
+        if index == 0:
+            return scrape_linkedin_profile(profile_url, headless=headless, store=store, fields=fields,
+                                           on_section=on_section)
+        user_data_dir, slot_lock = claim_profile_slot()
+        try:
+            scraper = LinkedInScraper(headless=headless, user_data_dir=user_data_dir, profile_lock=slot_lock)
+            try:
+                return scrape_with(scraper, profile_url, store=store, fields=fields, on_section=on_section)
+            finally:
+                scraper.close()
+        except Exception as e:
+            logger.exception(f"Scrape error: {e}")
+            return None
+        finally:
+            slot_lock.close()
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(run, i, url, fields) for i, (url, fields) in enumerate(jobs)]
+        return [future.result() for future in futures]
@@ -0,0 +1,242 @@
+import os, re, math, time, shlex, bisect, logging, tempfile, threading, unicodedata
+from config import SEARCH_INDEX_FILE, SEARCH_SYNC_INTERVAL
+from models import dumps, loads, ProfileSummary
+from profile_store import record_version
+
+logger = logging.getLogger(__name__)
+
+# Query field names (and aliases) -> indexed field
+FIELD_ALIASES = {
+    'skill': 'skill', 'skills': 'skill',
+    'title': 'title', 'titles': 'title',
+    'company': 'company', 'companies': 'company',
+    'school': 'school', 'schools': 'school',
+    'cert': 'cert', 'certification': 'cert', 'certifications': 'cert',
+}
+FIELDS = ('skill', 'title', 'company', 'school', 'cert')
+
+def normalize_term(text):
+    """Lowercase, strip accents and punctuation: 'Node.js ' -> 'node js'"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(re.findall(r'[a-z0-9+#]+', text.lower()))
+
+def _field_values(profile):
+    values = {field: [] for field in FIELDS}
+    values['skill'] = list(profile.get('skills') or [])
+    for item in profile.get('experience') or []:
+        values['title'].append(item.get('title', ''))
+        values['company'].append(item.get('company', ''))
+    for item in profile.get('education') or []:
+        values['school'].append(item.get('school', ''))
+    for item in profile.get('certifications') or []:
+        values['cert'].append(item.get('certificate', ''))
+        values['cert'].append(item.get('issuer', ''))
+    return values
+
+def extract_terms(profile):
+    """{field: {term: count}} with each value indexed as a phrase and as words"""
+    terms = {}
+    for field, values in _field_values(profile).items():
+        counts = terms.setdefault(field, {})
+        for value in values:
+            phrase = normalize_term(value)
+            if not phrase:
+                continue
+            words = phrase.split()
+            for term in set(words) | {phrase}:
+                counts[term] = counts.get(term, 0) + 1
+    return terms
+
+class SearchIndex:
+    """Inverted index over stored profiles: skills, titles, companies,
+    schools and certifications.
+
+    Kept in memory and persisted as one file; sync() picks up profiles the
+    store has written since the last sync, so the index stays incremental.
+
+    Query syntax: space-separated clauses are ANDed, `OR` separates
+    alternatives, a leading `-` excludes. `field:value` restricts a clause
+    to one field, `value*` matches by prefix and quotes match a phrase,
+    e.g. `skill:kubernetes company:fin* -title:intern`.
+    """
+
+    def __init__(self, path=SEARCH_INDEX_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.docs = {}        # key -> ProfileSummary
+        self.doc_terms = {}   # key -> {field: [terms]}, for removal on update
+        self.versions = {}    # key -> record_version of the indexed record
+        self.postings = {field: {} for field in FIELDS}  # field -> term -> {key: count}
+        self.sorted_terms = {}
+        self.synced_at = 0.0
+        self.checked_at = 0.0
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = loads(f.read())
+            self.docs = {key: ProfileSummary.from_dict(doc) for key, doc in data['docs'].items()}
+            self.doc_terms = data['doc_terms']
+            self.versions = data.get('versions', {})
+            self.synced_at = data['synced_at']
+            for key, fields in self.doc_terms.items():
+                self._add_postings(key, fields, data['counts'][key])
+        except Exception as e:
+            logger.exception(f"Could not load search index, rebuilding: {e}")
+            self.docs, self.doc_terms, self.versions, self.synced_at = {}, {}, {}, 0.0
+            self.postings = {field: {} for field in FIELDS}
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            counts = {
+                key: {field: [self.postings[field][term][key] for term in terms] for field, terms in fields.items()}
+                for key, fields in self.doc_terms.items()
+            }
+            docs = {key: doc.to_dict() for key, doc in self.docs.items()}
+            data = {'docs': docs, 'doc_terms': self.doc_terms, 'counts': counts, 'versions': self.versions,
+                    'synced_at': self.synced_at}
+            # A temp file per write: serving workers save the same index file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                            prefix='.search-index-', suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dumps(data))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def _add_postings(self, key, fields, counts):
+        for field, terms in fields.items():
+            postings = self.postings[field]
+            for term, count in zip(terms, counts[field]):
+                postings.setdefault(term, {})[key] = count
+        self.sorted_terms = {}
+
+    def add(self, key, profile):
+        with self.lock:
+            self.remove(key)
+            terms = extract_terms(profile)
+            fields = {field: list(field_terms) for field, field_terms in terms.items() if field_terms}
+            counts = {field: [terms[field][t] for t in field_terms] for field, field_terms in fields.items()}
+            self.doc_terms[key] = fields
+            self.docs[key] = ProfileSummary.from_dict(profile)
+            self._add_postings(key, fields, counts)
+            self.dirty = True
+
+    def remove(self, key):
+        with self.lock:
+            self.versions.pop(key, None)
+            for field, terms in self.doc_terms.pop(key, {}).items():
+                postings = self.postings[field]
+                for term in terms:
+                    docs = postings.get(term)
+                    if docs is not None:
+                        docs.pop(key, None)
+                        if not docs:
+                            del postings[term]
+            if self.docs.pop(key, None) is not None:
+                self.sorted_terms = {}
+                self.dirty = True
+
+    def sync(self, store, force=False):
+        """Index profiles the store wrote since the last sync"""
+        now = time.time()
+        if not force and now - self.checked_at < SEARCH_SYNC_INTERVAL:
+            return 0
+        with self.lock:
+            self.checked_at = now
+            added = 0
+            latest = self.synced_at
+            for key, mtime, record in store.iter_records(since=self.synced_at):
+                latest = max(latest, mtime)
+                version = record_version(record)
+                if self.versions.get(key) == version:
+                    continue
+                self.add(key, record.get('profile', {}))
+                self.versions[key] = version
+                added += 1
+            if added or latest != self.synced_at:
+                self.synced_at = latest
+                self.dirty = True
+            if added:
+                logger.info(f"Indexed {added} profiles ({len(self.docs)} total)")
+            self.save()
+            return added
+
+    def _terms_with_prefix(self, field, prefix):
+        terms = self.sorted_terms.get(field)
+        if terms is None:
+            terms = self.sorted_terms[field] = sorted(self.postings[field])
+        index = bisect.bisect_left(terms, prefix)
+        while index < len(terms) and terms[index].startswith(prefix):
+            yield terms[index]
+            index += 1
+
+    def _match_clause(self, clause):
+        """{key: score} for one clause"""
+        field, sep, value = clause.partition(':')
+        if sep and field.lower() in FIELD_ALIASES:
+            fields = [FIELD_ALIASES[field.lower()]]
+        else:
+            fields, value = FIELDS, clause
+        prefix = value.endswith('*')
+        term = normalize_term(value.rstrip('*'))
+        if not term:
+            return {}
+
+        total = max(len(self.docs), 1)
+        scores = {}
+        for field in fields:
+            postings = self.postings[field]
+            matched = self._terms_with_prefix(field, term) if prefix else ([term] if term in postings else [])
+            for matched_term in matched:
+                docs = postings[matched_term]
+                idf = math.log(1 + total / len(docs))
+                for key, count in docs.items():
+                    scores[key] = scores.get(key, 0.0) + idf * count / (count + 1)
+        return scores
+
+    def search(self, query, limit=20):
+        """Ranked matches for a query; see the class docstring for syntax"""
+        try:
+            tokens = shlex.split(query)
+        except ValueError:
+            tokens = query.split()
+
+        groups, current = [], []
+        for token in tokens:
+            if token == 'OR':
+                groups.append(current)
+                current = []
+            else:
+                current.append(token)
+        groups.append(current)
+
+        with self.lock:
+            results = {}
+            for group in groups:
+                include = [c for c in group if not c.startswith('-')]
+                exclude = [c[1:] for c in group if c.startswith('-') and len(c) > 1]
+                if not include:
+                    continue
+                group_scores = None
+                for clause in include:
+                    scores = self._match_clause(clause)
+                    if group_scores is None:
+                        group_scores = scores
+                    else:
+                        group_scores = {k: group_scores[k] + v for k, v in scores.items() if k in group_scores}
+                    if not group_scores:
+                        break
+                for clause in exclude:
+                    for key in self._match_clause(clause):
+                        group_scores.pop(key, None)
+                for key, score in (group_scores or {}).items():
+                    results[key] = max(results.get(key, 0.0), score)
+
+            ranked = sorted(results.items(), key=lambda item: -item[1])[:limit]
+            return [dict(self.docs[key].to_dict(), key=key, score=round(score, 3)) for key, score in ranked]
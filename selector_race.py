@@ -0,0 +1,122 @@
+import os, json, time, atexit, logging, tempfile, threading
+from config import SELECTOR_STATS_FILE, SELECTOR_STATS_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+def _is_xpath(selector):
+    return selector.startswith('/') or selector.startswith('(')
+
+class SelectorRace:
+    """Resolves a list of fallback selectors with a single wait.
+
+    All candidates are combined into one selector (a CSS selector list or an
+    XPath union) so Playwright waits for whichever appears first. Hit counts
+    are kept per group so the most successful selector is checked first and
+    reported as the winner next time.
+
+    Hits are written to disk in batches, at most every
+    SELECTOR_STATS_FLUSH_INTERVAL seconds and at exit. Each flush adds this
+    process's new hits to what other processes have saved meanwhile.
+    """
+
+    def __init__(self, stats_file=SELECTOR_STATS_FILE, flush_interval=SELECTOR_STATS_FLUSH_INTERVAL):
+        self.stats_file = stats_file
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.stats = self._load_stats()
+        self.pending = {}   # group -> {selector: hits not yet on disk}
+        self.last_flush = time.time()
+        atexit.register(self.flush)
+
+    def _load_stats(self):
+        try:
+            if os.path.exists(self.stats_file):
+                with open(self.stats_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load selector stats: {e}")
+        return {}
+
+    def _save_stats(self):
+        directory = os.path.dirname(os.path.abspath(self.stats_file))
+        # A temp file per write, so processes flushing at once don't clobber each other
+        fd, tmp_file = tempfile.mkstemp(dir=directory, prefix='.selector-stats-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.stats, f)
+            os.replace(tmp_file, self.stats_file)
+        except Exception as e:
+            logger.warning(f"Could not save selector stats: {e}")
+            try:
+                os.unlink(tmp_file)
+            except OSError:
+                pass
+
+    def flush(self):
+        """Write pending hits, merged into the stats currently on disk"""
+        with self.lock:
+            if not self.pending:
+                return
+            stats = self._load_stats()
+            for group, hits in self.pending.items():
+                group_stats = stats.setdefault(group, {})
+                for selector, count in hits.items():
+                    group_stats[selector] = group_stats.get(selector, 0) + count
+            self.stats = stats
+            self.pending = {}
+            self.last_flush = time.time()
+            self._save_stats()
+
+    def ordered(self, group, selectors):
+        """Selectors sorted by past hits, original order breaking ties"""
+        hits = self.stats.get(group, {})
+        return sorted(selectors, key=lambda s: -hits.get(s, 0))
+
+    def record_hit(self, group, selector):
+        with self.lock:
+            group_stats = self.stats.setdefault(group, {})
+            group_stats[selector] = group_stats.get(selector, 0) + 1
+            pending = self.pending.setdefault(group, {})
+            pending[selector] = pending.get(selector, 0) + 1
+            due = time.time() - self.last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    @staticmethod
+    def combine(selectors):
+        if all(_is_xpath(s) for s in selectors):
+            return "xpath=" + " | ".join(selectors)
+        if any(_is_xpath(s) for s in selectors):
+            raise ValueError("Cannot race CSS and XPath selectors together")
+        return ", ".join(selectors)
+
+    def resolve(self, page, group, selectors, timeout=None, accept=None):
+        """Return (selector, element) for the first candidate that matches.
+
+        With a timeout, waits once (in ms) for any candidate to become
+        visible; without one, only checks what is already on the page.
+        `accept` can reject a match (e.g. an element with empty text), in
+        which case the next candidate is tried.
+        """
+        # Outside the try: mixing CSS and XPath is a bug, not a missing element
+        combined = self.combine(selectors)
+        try:
+            if timeout:
+                page.wait_for_selector(combined, timeout=timeout)
+            elif not page.query_selector(combined):
+                return None, None
+        except Exception:
+            logger.debug(f"No {group} selector matched within {timeout}ms")
+            return None, None
+
+        for selector in self.ordered(group, selectors):
+            try:
+                element = page.query_selector(selector)
+                if element and (accept is None or accept(element)):
+                    self.record_hit(group, selector)
+                    return selector, element
+            except Exception:
+                continue
+        return None, None
+
+selector_race = SelectorRace()
@@ -0,0 +1,66 @@
+import os, json, logging, hashlib, tempfile
+
+logger = logging.getLogger(__name__)
+
+def _cookie_identity(cookie):
+    # Expiry is rounded to the day: LinkedIn pushes expiries forward on most
+    # requests, which alone is not worth a rewrite
+    expires = cookie.get('expires', -1)
+    return (cookie.get('domain', ''), cookie.get('path', ''), cookie.get('name', ''),
+            cookie.get('value', ''), int(expires // 86400) if expires and expires > 0 else -1)
+
+def state_hash(cookies):
+    """Order-independent hash of a cookie list"""
+    identities = sorted(_cookie_identity(c) for c in cookies)
+    return hashlib.sha256(json.dumps(identities, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+class SessionPersistence:
+    """Cookie file that is only rewritten when the session actually changed.
+
+    Writes are atomic (temp file + rename) and compactly encoded. The hash
+    of what is on disk is cached so unchanged saves cost no I/O.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.saved_hash = None
+
+    def load(self):
+        """Saved cookies, or [] when there is no session file"""
+        if not os.path.exists(self.path):
+            self.saved_hash = None
+            return []
+        with open(self.path, 'r') as f:
+            cookies = json.load(f)
+        self.saved_hash = state_hash(cookies)
+        return cookies
+
+    def is_current(self, cookies):
+        """True when cookies match what is on disk"""
+        if self.saved_hash is None:
+            self.load()
+        return self.saved_hash == state_hash(cookies)
+
+    def save(self, cookies):
+        """Write cookies if they changed; returns True when a write happened"""
+        new_hash = state_hash(cookies)
+        if self.saved_hash is None and os.path.exists(self.path):
+            try:
+                self.load()
+            except Exception:
+                pass
+        if new_hash == self.saved_hash and os.path.exists(self.path):
+            return False
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.cookies-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(cookies, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.saved_hash = new_hash
+        return True
@@ -0,0 +1,270 @@
+import os, math, mmap, time, zlib, heapq, logging, tempfile, threading
+from array import array
+from pathlib import Path
+from config import SIMILAR_INDEX_DIR, SIMILAR_VECTOR_DIM, SEARCH_SYNC_INTERVAL
+from models import dumps, loads, ProfileSummary
+from profile_store import store_key, record_version
+from search_index import normalize_term
+from file_lock import locked
+
+np = None
+_numpy_checked = False
+
+def _numpy():
+    """NumPy if installed, imported on first ranking rather than at startup"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy_checked = True
+    return np
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset(
+    'a am an and are as at be by can for from has have i in is it m me my of on or our that the this '
+    'to we who will with you your'.split()
+)
+# Rows added to the matrix file at a time, so growing it rarely remaps
+GROW_ROWS = 4096
+# Rows scored per matrix product when ranking
+BATCH_ROWS = 32768
+
+def profile_features(profile):
+    """{feature: count} from headline, about, skills and experience titles"""
+    features = {}
+
+    def add(feature):
+        features[feature] = features.get(feature, 0) + 1
+
+    for text in (profile.get('headline'), profile.get('about')):
+        for word in normalize_term(text or '').split():
+            if word not in STOPWORDS and len(word) > 1:
+                add(word)
+    for item in profile.get('experience') or []:
+        title = normalize_term(item.get('title', ''))
+        for word in title.split():
+            if word not in STOPWORDS:
+                add(word)
+        if title:
+            add(f"title:{title}")
+    for skill in profile.get('skills') or []:
+        skill = normalize_term(skill)
+        if skill:
+            add(f"skill:{skill}")
+    return features
+
+def hashed_vector(features, dim=SIMILAR_VECTOR_DIM):
+    """Sublinear term frequencies folded into `dim` signed buckets"""
+    vector = array('f', bytes(4 * dim))
+    for feature, count in features.items():
+        h = zlib.crc32(feature.encode('utf-8'))
+        vector[h % dim] += (1 + math.log(count)) * (1 if h & 0x80000000 else -1)
+    return vector
+
+def _norm(vector):
+    return math.sqrt(sum(v * v for v in vector))
+
+class SimilarIndex:
+    """Finds profiles similar to a given one by cosine similarity of hashed
+    term-frequency vectors.
+
+    Features are hashed into fixed-width float32 rows stored in a
+    memory-mapped matrix file. Rows are overwritten or appended as sync()
+    picks up newly stored profiles. There is no IDF weighting: with a few
+    hundred buckets, a rare skill shares its bucket with common words, so
+    per-bucket document frequencies say little about any one term.
+    Stopwords are dropped and counts are sublinear instead. Row norms are
+    computed once per row and stored with the index.
+    Ranking uses batched NumPy matrix products when NumPy is installed.
+    Otherwise it falls back to a slower pure-Python scan of the same file.
+
+    Serving workers share the files, so only one process writes at a time.
+    sync() holds writer.lock while it updates them, and it first reloads
+    whatever another worker wrote. Row numbers therefore always match
+    meta.json. Between syncs a process only reads its mapped view.
+    """
+
+    def __init__(self, root=SIMILAR_INDEX_DIR, dim=SIMILAR_VECTOR_DIM):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.matrix_path = self.root / "vectors.f32"
+        self.meta_path = self.root / "meta.json"
+        self.lock_path = self.root / "writer.lock"
+        self.dim = dim
+        self.lock = threading.RLock()
+        self.keys = []        # row -> store key
+        self.rows = {}        # store key -> row
+        self.docs = {}        # store key -> ProfileSummary
+        self.versions = {}    # store key -> record_version of the indexed record
+        self.norms = array('f')  # row -> vector norm
+        self.synced_at = 0.0
+        self.checked_at = 0.0
+        self.mm = None
+        self.capacity = 0
+        self.meta_mtime = None
+        with locked(self.lock_path):
+            self.load()
+
+    def load(self):
+        """Read meta.json and map the matrix; call with writer.lock held"""
+        self.keys, self.docs, self.versions, self.synced_at = [], {}, {}, 0.0
+        norms = None
+        self.meta_mtime = None
+        if self.meta_path.exists():
+            try:
+                with open(self.meta_path, 'rb') as f:
+                    meta = loads(f.read())
+                if meta['dim'] != self.dim:
+                    raise ValueError(f"index has dim {meta['dim']}, expected {self.dim}")
+                self.keys = meta['keys']
+                self.docs = {key: ProfileSummary.from_dict(doc) for key, doc in meta['docs'].items()}
+                self.versions = meta.get('versions', {})
+                norms = meta.get('norms')
+                self.synced_at = meta['synced_at']
+                self.meta_mtime = os.stat(self.meta_path).st_mtime_ns
+            except Exception as e:
+                logger.exception(f"Could not load similar-profile index, rebuilding: {e}")
+                self.keys, self.docs, self.versions, self.synced_at = [], {}, {}, 0.0
+                self.matrix_path.unlink(missing_ok=True)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self._map(max(len(self.keys), 1))
+        if norms is None or len(norms) != len(self.keys):
+            # Index written before norms were stored
+            norms = [_norm(self._row(row)) for row in range(len(self.keys))]
+        self.norms = array('f', norms)
+
+    def _map(self, rows):
+        """(Re)map the matrix file with room for at least `rows` rows"""
+        row_bytes = 4 * self.dim
+        capacity = -(-rows // GROW_ROWS) * GROW_ROWS
+        with open(self.matrix_path, 'a+b') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < capacity * row_bytes:
+                f.truncate(capacity * row_bytes)
+            else:
+                capacity = size // row_bytes
+            # Views into the old map may still be alive, so it is left to the GC
+            self.mm = mmap.mmap(f.fileno(), capacity * row_bytes)
+        self.capacity = capacity
+
+    def _matrix(self):
+        return np.frombuffer(self.mm, dtype=np.float32).reshape(self.capacity, self.dim)
+
+    def _row(self, row):
+        return memoryview(self.mm)[4 * self.dim * row:4 * self.dim * (row + 1)].cast('f')
+
+    def _current(self):
+        """Whether meta.json is still what this process last loaded or wrote"""
+        try:
+            return os.stat(self.meta_path).st_mtime_ns == self.meta_mtime
+        except FileNotFoundError:
+            return self.meta_mtime is None
+
+    def save(self):
+        """Write meta.json; call with writer.lock held"""
+        with self.lock:
+            self.mm.flush()
+            docs = {key: doc.to_dict() for key, doc in self.docs.items()}
+            meta = {'dim': self.dim, 'keys': self.keys, 'docs': docs, 'versions': self.versions,
+                    'norms': self.norms.tolist(), 'synced_at': self.synced_at}
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.meta-', suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dumps(meta))
+            os.replace(tmp_path, self.meta_path)
+            self.meta_mtime = os.stat(self.meta_path).st_mtime_ns
+
+    def add(self, key, profile):
+        vector = hashed_vector(profile_features(profile), self.dim)
+        with self.lock:
+            row = self.rows.get(key)
+            if row is None:
+                row = len(self.keys)
+                if row >= self.capacity:
+                    self._map(row + 1)
+                self.keys.append(key)
+                self.rows[key] = row
+                self.norms.append(0.0)
+            self._row(row)[:] = vector
+            self.norms[row] = _norm(vector)
+            self.docs[key] = ProfileSummary.from_dict(profile)
+
+    def sync(self, store, force=False):
+        """Index profiles the store wrote since the last sync"""
+        now = time.time()
+        if not force and now - self.checked_at < SEARCH_SYNC_INTERVAL:
+            return 0
+        with self.lock, locked(self.lock_path):
+            self.checked_at = now
+            if not self._current():
+                # Another worker extended the index; adopt its rows before adding any
+                self.load()
+            added = 0
+            latest = self.synced_at
+            for key, mtime, record in store.iter_records(since=self.synced_at):
+                latest = max(latest, mtime)
+                version = record_version(record)
+                if self.versions.get(key) == version:
+                    continue
+                self.add(key, record.get('profile', {}))
+                self.versions[key] = version
+                added += 1
+            if added or latest != self.synced_at:
+                # Only a real change rewrites meta.json, which makes the other workers reload
+                self.synced_at = latest
+                self.save()
+            if added:
+                logger.info(f"Vectorised {added} profiles ({len(self.keys)} total)")
+            return added
+
+    def similar(self, profile_url, store=None, limit=10):
+        """Most similar indexed profiles to profile_url, or None if it is unknown"""
+        key = store_key(profile_url)
+        with self.lock:
+            row = self.rows.get(key)
+            if row is not None:
+                query = array('f', self._row(row))
+            else:
+                record = store.get(profile_url) if store else None
+                if record is None:
+                    return None
+                query = hashed_vector(profile_features(record.get('profile', {})), self.dim)
+            if not any(query):
+                return []
+            ranked = self._rank_numpy(query, key, limit) if _numpy() is not None else self._rank_python(query, key, limit)
+            return [dict(self.docs[self.keys[r]].to_dict(), key=self.keys[r], score=round(score, 4)) for r, score in ranked]
+
+    def _rank_numpy(self, query, exclude_key, limit):
+        count = len(self.keys)
+        matrix = self._matrix()[:count]
+        norms = np.array(self.norms, dtype=np.float32)
+        norms[norms == 0] = np.inf
+        query = np.asarray(query, dtype=np.float32)
+        query_norm = float(np.sqrt(query @ query))
+
+        scores = np.empty(count, dtype=np.float32)
+        for start in range(0, count, BATCH_ROWS):
+            scores[start:start + BATCH_ROWS] = matrix[start:start + BATCH_ROWS] @ query
+        scores /= norms * query_norm
+        row = self.rows.get(exclude_key)
+        if row is not None:
+            scores[row] = -np.inf
+
+        k = min(limit, count)
+        top = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+        top = top[np.argsort(-scores[top])]
+        return [(int(r), float(scores[r])) for r in top if scores[r] > 0]
+
+    def _rank_python(self, query, exclude_key, limit):
+        query_norm = _norm(query)
+        exclude = self.rows.get(exclude_key)
+        scored = []
+        for row in range(len(self.keys)):
+            norm = self.norms[row]
+            if row == exclude or not norm:
+                continue
+            vector = self._row(row)
+            scored.append((sum(v * q for v, q in zip(vector, query)) / (norm * query_norm), row))
+        return [(row, score) for score, row in heapq.nlargest(limit, scored) if score > 0]
@@ -0,0 +1,161 @@
+"""Offline extraction of profile fields from HTML snapshots.
+
+In snapshot mode (config.HTML_SNAPSHOT) the scraper captures each page once
+with page.content(), moves on to the next navigation and hands the HTML to
+parse_snapshot() in a process pool. Browser I/O and CPU-bound parsing then
+overlap. The parser evaluates the XPath selectors in profile_selectors with
+lxml, the same ones LinkedInScraper uses on the live DOM.
+"""
+import time, logging, threading, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import profile_selectors as sel
+from config import SNAPSHOT_PARSE_WORKERS
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+# Stands in for <br> while whitespace is collapsed, then becomes a newline
+_LINE_BREAK = '\ue000'
+
+def available():
+    return lxml_html is not None
+
+def _text(element):
+    """Element text with whitespace collapsed like the browser's innerText"""
+    if element is None:
+        return ""
+    for br in element.iter('br'):
+        br.tail = _LINE_BREAK + (br.tail or '')
+    text = ' '.join(element.text_content().split())
+    return '\n'.join(line.strip() for line in text.split(_LINE_BREAK)).strip()
+
+def _first(element, xpath):
+    if element is None:
+        return None
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+def _items(tree, xpath, limit):
+    items = tree.xpath(xpath)
+    return items if limit is None else items[:limit]
+
+def parse_name(tree, limits):
+    return _text(_first(tree, sel.NAME)) or sel.NOT_FOUND['name']
+
+def parse_headline(tree, limits):
+    return _text(_first(tree, sel.HEADLINE)) or sel.NOT_FOUND['headline']
+
+def parse_about(tree, about_selectors):
+    """(about text, winning selector) trying selectors in the scraper's order"""
+    if _first(tree, sel.section_header('about')) is None:
+        return sel.NOT_FOUND['about'], None
+    for selector in about_selectors:
+        text = _text(_first(tree, selector))
+        if text:
+            return text, selector
+    return sel.NOT_FOUND['about'], None
+
+def parse_education(tree, limits):
+    header = _first(tree, sel.section_header('education'))
+    container = _first(header, sel.EDUCATION_CONTAINER)
+    education_list = _first(container, sel.EDUCATION_LIST)
+    if education_list is None:
+        return []
+    education = []
+    for item in _items(education_list, sel.EDUCATION_ITEM, limits.get('education')):
+        school_element = _first(item, sel.ENTRY_TITLE)
+        degree_element = _first(school_element, sel.ENTRY_SUBTITLE)
+        school = _text(school_element)
+        degree, field = sel.split_degree(_text(degree_element))
+        if school:
+            education.append({
+                'school': school,
+                'degree': degree,
+                'field': field,
+                'year': _text(_first(degree_element, sel.ENTRY_CAPTION)),
+            })
+    return education
+
+def parse_experience(tree, limit):
+    experience = []
+    for item in _items(tree, sel.LIST_ITEM, limit):
+        title = _text(_first(item, sel.ENTRY_TITLE))
+        company = sel.company_name(_text(_first(item, sel.EXPERIENCE_COMPANY)))
+        if title and company:
+            experience.append({
+                'title': title,
+                'company': company,
+                'duration': sel.duration(_text(_first(item, sel.EXPERIENCE_DURATION))),
+            })
+    return experience
+
+def parse_skills(tree, limit):
+    skills = (_text(_first(item, sel.ENTRY_TITLE)) for item in _items(tree, sel.LIST_ITEM, limit))
+    return list(dict.fromkeys(skill for skill in skills if skill))
+
+def parse_certifications(tree, limit):
+    certifications = []
+    for item in _items(tree, sel.CERTIFICATION_ITEM, limit):
+        certificate_element = _first(item, sel.ENTRY_TITLE)
+        issuer_element = _first(certificate_element, sel.ENTRY_SUBTITLE)
+        links = item.xpath(sel.ENTRY_LINKS)
+        certificate = _text(certificate_element)
+        if certificate:
+            certifications.append({
+                'certificate': certificate,
+                'link': (links[1].get('href') or '') if len(links) > 1 else '',
+                'issuer': _text(issuer_element),
+                'date': _text(_first(issuer_element, sel.ENTRY_CAPTION)),
+            })
+    return certifications
+
+MAIN_PARSERS = {
+    'name': parse_name,
+    'headline': parse_headline,
+    'education': parse_education,
+}
+DETAIL_PARSERS = {
+    'experience': parse_experience,
+    'skills': parse_skills,
+    'certifications': parse_certifications,
+}
+
+def parse_snapshot(page, html, sections, limits, about_selectors=()):
+    """Parse one captured page. `page` is 'main' or a details section.
+
+    Returns {section: (value, seconds)}; 'about' also carries the winning
+    selector as a third element so the parent can record the hit.
+    """
+    start = time.perf_counter()
+    tree = lxml_html.fromstring(html)
+    parsed = {}
+    if page != 'main':
+        value = DETAIL_PARSERS[page](tree, limits.get(page))
+        parsed[page] = (value, round(time.perf_counter() - start, 3))
+        return parsed
+    for section in sections:
+        section_start = time.perf_counter()
+        if section == 'about':
+            value, selector = parse_about(tree, about_selectors)
+            parsed[section] = (value, round(time.perf_counter() - section_start, 3), selector)
+        else:
+            value = MAIN_PARSERS[section](tree, limits)
+            parsed[section] = (value, round(time.perf_counter() - section_start, 3))
+    return parsed
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def parse_pool():
+    """Process pool shared by every scraper in this process, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned, not forked: the parent runs Playwright threads
+            _pool = ProcessPoolExecutor(max_workers=SNAPSHOT_PARSE_WORKERS,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
@@ -0,0 +1,85 @@
+"""Startup benchmark for the CLI and web workers.
+
+Runs each scenario in a fresh interpreter with `python -X importtime` and
+reports the median wall time against its target, plus the slowest
+top-level imports. It exits non-zero when a target is missed, so it can
+run in CI. --history appends each run to a JSON-lines file, so regressions
+show up over time.
+
+    python startup_bench.py --repeat 5 --history startup_history.jsonl
+
+The web-worker scenario covers importing app and building the Flask app.
+It does not cover launching browsers, which serve mode does after boot.
+"""
+import os, sys, json, time, argparse, statistics, subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Median wall time targets in seconds
+SCENARIOS = {
+    'help': ([sys.executable, '-X', 'importtime', 'app.py', '--help'], 0.3),
+    'web_worker': ([sys.executable, '-X', 'importtime', '-c', 'import app; app.create_flask_app()'], 1.0),
+}
+
+def parse_importtime(stderr):
+    """{top-level module: cumulative microseconds} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented under the module that triggered them
+        if not name.startswith('  '):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+def run_scenario(command, repeat):
+    times, imports = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(command, cwd=HERE, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{proc.stderr[-2000:]}")
+        imports = parse_importtime(proc.stderr)
+    return statistics.median(times), imports
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI and web-worker startup time")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list per scenario")
+    parser.add_argument("--history", help="Append results to this JSON-lines file")
+    args = parser.parse_args()
+
+    results = {}
+    missed = []
+    for name, (command, target) in SCENARIOS.items():
+        seconds, imports = run_scenario(command, args.repeat)
+        status = "ok" if seconds <= target else "MISSED"
+        if seconds > target:
+            missed.append(name)
+        print(f"{name:<12} {seconds * 1000:7.0f} ms  (target {target * 1000:.0f} ms)  {status}")
+        for module, micros in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {micros / 1000:7.1f} ms  {module}")
+        results[name] = {'seconds': round(seconds, 4), 'target': target,
+                         'imports_ms': {m: round(us / 1000, 1) for m, us in imports.items()}}
+
+    if args.history:
+        entry = {'ts': round(time.time()), 'revision': git_revision(), 'python': sys.version.split()[0],
+                 'results': results}
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+    if missed:
+        print(f"\nTargets missed: {', '.join(missed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,193 @@
 import os
+import time
 import logging
 import json
-from google import genai
-from dotenv import load_dotenv
 from datetime import datetime
 import re
+from models import Profile, normalize_profile
+from analysis_schemas import ANALYSIS_SCHEMAS, validate_result
+from usage_log import usage_log
+from model_router import model_router
+from config import MODEL_THINKING_BUDGETS, DEFAULT_THINKING_BUDGET
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(name)s - %(levelname)s - %(message)s'
-    )
 logger = logging.getLogger(__name__)
-load_dotenv()
+
+PROFILE_FIELD_LABELS = {
+    'name': 'Name',
+    'headline': 'Headline',
+    'about': 'About',
+    'experience': 'Experience',
+    'skills': 'Skills',
+    'education': 'Education',
+    'certifications': 'Certifications',
+}
+
+ALL_FIELDS = tuple(PROFILE_FIELD_LABELS)
+
+# Profile fields each analysis mode actually uses, so scraping can skip
+# detail pages a mode does not need. Outreach angles build on shared
+# background, skills and interests, so approach_person skips the
+# certifications page; the brief and the compatibility comparison use them.
+MODE_FIELDS = {
+    "about_profile": ALL_FIELDS,
+    "approach_person": tuple(f for f in ALL_FIELDS if f != 'certifications'),
+    "compatibility_score": ALL_FIELDS,
+}
+
+def required_fields(*modes):
+    """Union of the profile fields needed by the given analysis modes"""
+    fields = set()
+    for mode in modes:
+        fields.update(MODE_FIELDS.get(mode, ALL_FIELDS))
+    return tuple(f for f in ALL_FIELDS if f in fields)
+
+class InvalidOutputError(ValueError):
+    """The model answered, but not with JSON matching the mode's schema"""
 
 class ProfileAnalyzer:
 
-    def __init__(self, temperature=0.4):
-        if not os.getenv("GEMINI_API_KEY"):
-            raise ValueError("Gemini API key is required. Please set GEMINI_API_KEY in your .env file.")
-        self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-        self.model = 'gemini-2.5-flash'
+    def __init__(self, temperature=0.4, client=None):
+        # `client` replaces genai.Client, e.g. with loadtest.FakeGenaiClient
+        if client is None:
+            if not os.getenv("GEMINI_API_KEY"):
+                raise ValueError("Gemini API key is required. Please set GEMINI_API_KEY in your .env file.")
+            # Imported here: google-genai is slow to import and only needed for real calls
+            from google import genai
+            client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self.client = client
+        self.router = model_router
         self.temperature = temperature
         logger.info("\n\nProfessional Gemini client initialized\n")
 
     def analyze(self, profile_data, mode="about_profile", **kwargs):
-        if not isinstance(profile_data, dict):
-            raise ValueError("profile_data must be a dict")
+        if not isinstance(profile_data, (dict, Profile)):
+            raise ValueError("profile_data must be a dict or Profile")
+        profile_data = normalize_profile(profile_data)
+        if kwargs.get('user_data') is not None:
+            kwargs['user_data'] = normalize_profile(kwargs['user_data'])
         
         gen_config = self._get_generation_config(mode)
 
         prompt = self._create_professional_prompt(profile_data, mode, **kwargs)
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config={
-                    "temperature": gen_config["temperature"],
-                    "top_p": gen_config["top_p"],
-                    "top_k": gen_config["top_k"],
-                    # "max_output_tokens": gen_config["max_output_tokens"]
-                }
-            )
-            try:
-                if hasattr(response, 'candidates') and response.candidates:
-                    text = response.candidates[0].content.parts[0].text.strip()
-                elif hasattr(response, 'text'):
-                    text = response.text.strip()
-                else:
-                    text = str(response)
-            except (AttributeError, IndexError) as e:
-                logger.exception(f"Error extracting text: {e}")
-                text = str(response)
-            
-            # Extract JSON block if it has markdown formatting
-            text = text.strip()
-            if text.startswith('```json'):
-                text = text[7:]
-            elif text.startswith('```'):
-                text = text[3:]
-            
-            if text.endswith('```'):
-                text = text[:-3]
-                
-            text = text.strip()
-            
-            # Just to be extremely safe, find the JSON braces
-            start_idx = text.find('{')
-            end_idx = text.rfind('}')
-            if start_idx != -1 and end_idx != -1 and end_idx >= start_idx:
-                text = text[start_idx:end_idx+1]
-                
-            try:
-                parsed_json = json.loads(text)
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse JSON. Falling back to raw text dict wrapper.")
-                parsed_json = {"raw_text": text}
+        if usage_log.over_budget():
+            logger.warning(f"Daily token budget of {usage_log.daily_budget} reached, not generating {mode}")
+            return {
+                "result": "The daily analysis budget has been used up. Please try again tomorrow.",
+                "mode": mode,
+                "profile_name": profile_data.get("name", "Unknown"),
+                "error": True,
+                "budget_exceeded": True
+            }
 
+        chain, demoted = self.router.chain(mode)
+        attempts = []
+        last_error = None
+        for model in chain:
+            started = time.perf_counter()
+            try:
+                parsed_json, usage = self._generate(model, mode, prompt, gen_config)
+            except InvalidOutputError as e:
+                # The call worked but the output did not; escalate to the next model
+                latency_ms = round((time.perf_counter() - started) * 1000)
+                self.router.record(model, latency_ms, ok=True)
+                attempts.append({"model": model, "outcome": "invalid_output", "latency_ms": latency_ms})
+                logger.warning(f"{model} returned invalid {mode} output: {e}")
+                last_error = e
+                continue
+            except Exception as e:
+                latency_ms = round((time.perf_counter() - started) * 1000)
+                self.router.record(model, latency_ms, ok=False)
+                usage_log.record(mode, model, latency_ms / 1000, error=True)
+                attempts.append({"model": model, "outcome": "api_error", "latency_ms": latency_ms})
+                logger.exception(f"Error generating {mode} with {model}: {e}")
+                last_error = e
+                continue
+
+            self.router.record(model, usage['latency_ms'], ok=True)
+            attempts.append({"model": model, "outcome": "ok", "latency_ms": usage['latency_ms']})
             result = {
                 "result": parsed_json,
                 "mode": mode,
                 "profile_name": profile_data.get("name", "Unknown"),
-                "model": self.model,
+                "model": model,
                 "temperature": gen_config["temperature"],
+                "usage": usage,
+                "routing": {"chain": chain, "demoted": demoted, "attempts": attempts},
                 "generated_at": datetime.now().strftime("%m/%d/%Y, %I:%M:%S %p")
             }
             
-            logger.info("%s generated successfully for %s", mode.capitalize(), profile_data.get("name", "Unknown"))
+            logger.info("%s generated successfully for %s with %s (%s tokens, %s ms)", mode.capitalize(),
+                        profile_data.get("name", "Unknown"), model, usage['total_tokens'], usage['latency_ms'])
             return result
-        
-        except Exception as e:
-            logger.exception(f"Error generating {mode}: {e}")
-            return {
-                "result": f"Error generating analysis: {str(e)}",
-                "mode": mode,
-                "profile_name": profile_data.get("name", "Unknown"),
-                "error": True
-            }
+
+        return {
+            "result": f"Error generating analysis: {str(last_error)}",
+            "mode": mode,
+            "profile_name": profile_data.get("name", "Unknown"),
+            "routing": {"chain": chain, "demoted": demoted, "attempts": attempts},
+            "error": True
+        }
+
+    def _generate(self, model, mode, prompt, gen_config):
+        """One call to one model; returns (parsed output, usage)"""
+        started = time.perf_counter()
+        response = self.client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=self._request_config(mode, gen_config, model)
+        )
+        usage = usage_log.record(mode, model, time.perf_counter() - started, response=response)
+        try:
+            if hasattr(response, 'candidates') and response.candidates:
+                text = response.candidates[0].content.parts[0].text.strip()
+            elif hasattr(response, 'text'):
+                text = response.text.strip()
+            else:
+                text = str(response)
+        except (AttributeError, IndexError, TypeError) as e:
+            logger.exception(f"Error extracting text: {e}")
+            text = str(response)
+
+        parsed_json = self._parse_json(text)
+        if parsed_json is None:
+            raise InvalidOutputError("Model output was not valid JSON")
+        schema_errors = validate_result(mode, parsed_json)
+        if schema_errors:
+            raise InvalidOutputError(f"Model output did not match the {mode} schema: {'; '.join(schema_errors[:5])}")
+        return parsed_json, usage
     
+    def _request_config(self, mode, gen_config, model):
+        """Generation config for the API call: JSON output constrained to the mode's schema"""
+        # Thinking tokens count towards max_output_tokens; an explicit budget keeps the cap a real bound
+        thinking_budget = MODEL_THINKING_BUDGETS.get(model, DEFAULT_THINKING_BUDGET)
+        config = {
+            "temperature": gen_config["temperature"],
+            "top_p": gen_config["top_p"],
+            "top_k": gen_config["top_k"],
+            "max_output_tokens": gen_config["max_output_tokens"] + thinking_budget,
+            "response_mime_type": "application/json",
+            "thinking_config": {"thinking_budget": thinking_budget},
+        }
+        if mode in ANALYSIS_SCHEMAS:
+            config["response_schema"] = ANALYSIS_SCHEMAS[mode]
+        return config
+
+    def _parse_json(self, text):
+        """Parse the model output; strips markdown fences left by models without JSON mode"""
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            pass
+        start_idx = text.find('{')
+        end_idx = text.rfind('}')
+        if start_idx == -1 or end_idx < start_idx:
+            return None
+        try:
+            return json.loads(text[start_idx:end_idx + 1])
+        except json.JSONDecodeError:
+            return None
+
     def _get_generation_config(self, mode):
         """Optimized generation settings for professional output"""
         config_map = {
@@ -105,26 +195,26 @@ class ProfileAnalyzer:
                 "temperature": 0.3,
                 "top_p": 0.8,
                 "top_k": 35,
-                # "max_output_tokens": 800,
+                "max_output_tokens": 800,
             },
             "approach_person": {
                 "temperature": 0.6,
                 "top_p": 0.9,
                 "top_k": 50,
-                # "max_output_tokens": 1500,
+                "max_output_tokens": 1500,
             },
             "compatibility_score": {
                 "temperature": 0.35,
                 "top_p": 0.8,
                 "top_k": 40,
-                # "max_output_tokens": 600,
+                "max_output_tokens": 600,
             }
         }
         return config_map.get(mode, {
             "temperature": 0.45,
             "top_p": 0.85,
             "top_k": 37,
-            # "max_output_tokens": 1000
+            "max_output_tokens": 1000
         })
     
     def _create_professional_prompt(self, profile_data, mode, **kwargs):
@@ -138,6 +228,12 @@ class ProfileAnalyzer:
                 user_data = kwargs.get('user_data')
                 return self._compatibility_prompt(user_data, profile_data)
         
+    def _format_profile(self, profile_data, mode):
+        lines = []
+        for field in MODE_FIELDS.get(mode, ALL_FIELDS):
+            lines.append(f"{PROFILE_FIELD_LABELS[field]}: {profile_data.get(field, 'Not available')}")
+        return "\n".join(lines)
+
     def _about_prompt(self,profile_data):
         
         return f"""You are an expert career analyst and professional communicator.
@@ -145,13 +241,7 @@ class ProfileAnalyzer:
 Task: Generate a 30-second intelligence brief from a LinkedIn profile. The goal is to allow someone to quickly understand the person's professional background without reading the full profile.
 
 Profile Information: 
-Name: {profile_data["name"]}
-Headline: {profile_data["headline"]}
-About: {profile_data["about"]}
-Experience: {profile_data["experience"]}
-Skills: {profile_data["skills"]}
-Education: {profile_data["education"]}
-Certifications: {profile_data["certifications"]}
+{self._format_profile(profile_data, "about_profile")}
 
 Output Requirements:
 - MUST output strictly as a JSON object, with NO markdown wrappers.
@@ -186,13 +276,7 @@ Now generate a 30-second intelligence brief as a strict JSON object using the Pr
 Task: Using the LinkedIn profile of a target person, generate a set of personalized outreach angles and LinkedIn messages that are highly relevant and non-generic. The goal is to help someone connect effectively, leveraging shared background, skills, and interests.
 
 Profile Information:
-Name: {profile_data["name"]}
-Headline: {profile_data["headline"]}
-About: {profile_data["about"]}
-Experience: {profile_data["experience"]}
-Skills: {profile_data["skills"]}
-Education: {profile_data["education"]}
-Certifications: {profile_data["certifications"]}
+{self._format_profile(profile_data, "approach_person")}
 
 Output Requirements:
 
@@ -253,22 +337,10 @@ Task: Compare two LinkedIn profiles and generate a compatibility score (0–100%
 
 Inputs:
 User 1 Profile:
-Name: {user_data["name"]}
-Headline: {user_data["headline"]}
-About: {user_data["about"]}
-Experience: {user_data["experience"]}
-Skills: {user_data["skills"]}
-Education: {user_data["education"]}
-Certifications: {user_data["certifications"]}
+{self._format_profile(user_data, "compatibility_score")}
 
 User 2 Profile:
-Name: {profile_data["name"]}
-Headline: {profile_data["headline"]}
-About: {profile_data["about"]}
-Experience: {profile_data["experience"]}
-Skills: {profile_data["skills"]}
-Education: {profile_data["education"]}
-Certifications: {profile_data["certifications"]}
+{self._format_profile(profile_data, "compatibility_score")}
 
 Evaluation Dimensions:
 - Industry overlap
@@ -345,7 +417,7 @@ Now generate the compatibility score, reasoning, and recommendation for User 1 a
     
         return text.strip()
     
-def analyze_profile(profile_data, mode="about_profile", temperature=None, **kwargs):
+def analyze_profile(profile_data, mode="about_profile", temperature=None, client=None, **kwargs):
     """Main analysis function"""
-    analyzer = ProfileAnalyzer(temperature=temperature or 0.4)
+    analyzer = ProfileAnalyzer(temperature=temperature or 0.4, client=client)
     return analyzer.analyze(profile_data, mode, **kwargs)
@@ -0,0 +1,28 @@
+"""Analysis modes only scrape the details pages their prompts use."""
+from scraper import resolve_detail_sections
+from summarizer import ProfileAnalyzer, required_fields
+
+PROFILE = {
+    'name': 'Jane Doe',
+    'headline': 'Staff Engineer at Acme',
+    'about': 'I build data platforms.',
+    'experience': [{'title': 'Staff Engineer', 'company': 'Acme', 'duration': '3 yrs'}],
+    'skills': ['Python'],
+    'education': [],
+    'certifications': [{'certificate': 'Cloud Architect', 'link': '', 'issuer': 'Example', 'date': '2022'}],
+}
+
+def test_approach_person_skips_certifications_page():
+    assert resolve_detail_sections(required_fields('approach_person')) == {'experience', 'skills'}
+
+def test_other_modes_visit_every_details_page():
+    for mode in ('about_profile', 'compatibility_score'):
+        assert resolve_detail_sections(required_fields(mode)) == {'experience', 'skills', 'certifications'}
+
+def test_combined_modes_need_the_union():
+    assert 'certifications' in required_fields('approach_person', 'compatibility_score')
+
+def test_prompts_match_the_scraped_fields():
+    analyzer = ProfileAnalyzer.__new__(ProfileAnalyzer)
+    assert 'Cloud Architect' not in analyzer._approach_prompt(PROFILE)
+    assert 'Cloud Architect' in analyzer._about_prompt(PROFILE)
@@ -0,0 +1,149 @@
+import os, time, logging, threading, statistics
+from datetime import date, timedelta
+from pathlib import Path
+from config import USAGE_LOG_DIR, USAGE_RETENTION_DAYS, DAILY_TOKEN_BUDGET, BUDGET_SPECULATION_CUTOFF
+from models import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+def usage_from_response(response):
+    """Token counts from a generate_content response's usage metadata"""
+    metadata = getattr(response, 'usage_metadata', None)
+
+    def count(name):
+        return getattr(metadata, name, None) or 0
+
+    return {
+        'prompt_tokens': count('prompt_token_count'),
+        'output_tokens': count('candidates_token_count') + count('thoughts_token_count'),
+        'total_tokens': count('total_token_count'),
+    }
+
+class UsageLog:
+    """Token usage and latency of every Gemini call.
+
+    Calls are appended as JSON lines to one file per day. Each line is a
+    single O_APPEND write, so gunicorn workers can share the log. Files
+    older than the retention window are pruned. Today's token total is
+    kept current by reading only the bytes appended since the last check,
+    which makes the daily budget cheap to enforce on every call.
+    """
+
+    def __init__(self, root=USAGE_LOG_DIR, daily_budget=DAILY_TOKEN_BUDGET, retention_days=USAGE_RETENTION_DAYS):
+        self.root = Path(root)
+        self.daily_budget = daily_budget
+        self.retention_days = retention_days
+        self.lock = threading.Lock()
+        self.day = None
+        self.offset = 0
+        self.tokens_today = 0
+
+    def _path(self, day):
+        return self.root / f"{day.isoformat()}.jsonl"
+
+    def record(self, mode, model, latency, response=None, error=False):
+        """Log one call and return its usage dict (tokens and latency_ms)"""
+        usage = usage_from_response(response) if response is not None else {
+            'prompt_tokens': 0, 'output_tokens': 0, 'total_tokens': 0}
+        usage['latency_ms'] = round(latency * 1000)
+        entry = dict(usage, ts=round(time.time(), 3), mode=mode, model=model, error=error)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            today = date.today()
+            if not self._path(today).exists():
+                self.prune(today)
+            fd = os.open(self._path(today), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, dumps(entry) + b'\n')
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"Could not record Gemini usage: {e}")
+        return usage
+
+    def prune(self, today=None):
+        cutoff = (today or date.today()) - timedelta(days=self.retention_days)
+        for path in self.root.glob('*.jsonl'):
+            try:
+                if date.fromisoformat(path.stem) < cutoff:
+                    path.unlink()
+            except (ValueError, OSError):
+                continue
+
+    def today_tokens(self):
+        """Tokens used today by all processes sharing the log"""
+        with self.lock:
+            today = date.today()
+            if today != self.day:
+                self.day, self.offset, self.tokens_today = today, 0, 0
+            try:
+                with open(self._path(today), 'rb') as f:
+                    f.seek(self.offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return self.tokens_today
+            # A line still being written by another process is read next time
+            complete = data[:data.rfind(b'\n') + 1]
+            self.offset += len(complete)
+            for line in complete.splitlines():
+                try:
+                    self.tokens_today += loads(line).get('total_tokens', 0)
+                except ValueError:
+                    continue
+            return self.tokens_today
+
+    def budget_used(self):
+        """Fraction of today's token budget used (0 when there is no budget)"""
+        if not self.daily_budget:
+            return 0.0
+        return self.today_tokens() / self.daily_budget
+
+    def over_budget(self):
+        return self.budget_used() >= 1.0
+
+    def near_budget(self):
+        return self.budget_used() >= BUDGET_SPECULATION_CUTOFF
+
+    def entries(self, days=1):
+        today = date.today()
+        for offset in range(days - 1, -1, -1):
+            path = self._path(today - timedelta(days=offset))
+            if not path.exists():
+                continue
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        yield loads(line)
+                    except ValueError:
+                        continue
+
+    def summary(self, days=1):
+        """Calls, tokens and latency percentiles per (mode, model) over the last `days` days"""
+        groups = {}
+        for entry in self.entries(days):
+            groups.setdefault((entry['mode'], entry['model']), []).append(entry)
+
+        rows = []
+        for (mode, model), entries in sorted(groups.items()):
+            ok = [e for e in entries if not e.get('error')]
+            latencies = sorted(e['latency_ms'] for e in ok) or [0]
+            rows.append({
+                'mode': mode,
+                'model': model,
+                'calls': len(entries),
+                'errors': len(entries) - len(ok),
+                'prompt_tokens': sum(e['prompt_tokens'] for e in entries),
+                'output_tokens': sum(e['output_tokens'] for e in entries),
+                'total_tokens': sum(e['total_tokens'] for e in entries),
+                'avg_prompt_tokens': round(sum(e['prompt_tokens'] for e in ok) / len(ok)) if ok else 0,
+                'p50_latency_ms': round(statistics.median(latencies)),
+                'p95_latency_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            })
+        return {
+            'days': days,
+            'daily_budget': self.daily_budget,
+            'tokens_today': self.today_tokens(),
+            'by_mode_model': rows,
+        }
+
+usage_log = UsageLog()